@@ -1,11 +1,41 @@
 """Authentication logic and middleware."""
 
+import asyncio
+import os
 import bcrypt
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 from nicegui import app, ui
-from data import get_user_by_email
+from config import settings
+from data_async import get_user_by_email
 from models import User
 
+# Singleton executor for bcrypt work
+_password_executor: ThreadPoolExecutor | None = None
+
+
+def get_password_executor() -> ThreadPoolExecutor:
+    """Get the password hashing executor (singleton pattern).
+
+    bcrypt releases the GIL while hashing, so one thread per core lets
+    concurrent logins verify in parallel without touching the event loop.
+    """
+    global _password_executor
+    if _password_executor is None:
+        _password_executor = ThreadPoolExecutor(
+            max_workers=settings.password_workers or os.cpu_count() or 2,
+            thread_name_prefix="bcrypt",
+        )
+    return _password_executor
+
+
+def shutdown_password_executor() -> None:
+    """Stop the password executor. Registered on app shutdown in main.py."""
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=False, cancel_futures=True)
+        _password_executor = None
+
 
 def hash_password(password: str) -> str:
     """Hash password with bcrypt."""
@@ -20,6 +50,14 @@ def verify_password(password: str, hashed: str) -> bool:
         return False
 
 
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """Verify password in the password executor, off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_password_executor(), verify_password, password, hashed
+    )
+
+
 async def authenticate(email: str, password: str) -> User | None:
     import logging
 
@@ -30,7 +68,7 @@ async def authenticate(email: str, password: str) -> User | None:
 
     logger.info(f"[AUTH] Attempting login for: {email}")
 
-    user_data = get_user_by_email(email)
+    user_data = await get_user_by_email(email)
 
     if not user_data:
         return None
@@ -39,7 +77,7 @@ async def authenticate(email: str, password: str) -> User | None:
     if not stored_hash:
         return None
 
-    if not verify_password(password, stored_hash):
+    if not await verify_password_async(password, stored_hash):
         return None
 
     logger.info(f"[AUTH] Login successful for: {email}")
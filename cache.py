@@ -0,0 +1,177 @@
+"""In-process caches.
+
+Aggregates: size-bounded LRU with a TTL per entry. Entries are keyed by
+namespace (one per cached function) and tenant, so mutations can drop
+exactly the aggregates they affect via invalidate_tenant(). Concurrent
+identical page queries are coalesced one level up, in data_async.run_db_shared.
+
+Transcripts: byte-budgeted LRU without expiry for chats of finished
+sessions, which never change (see data.get_session_history).
+"""
+
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from config import settings
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> tuple[bool, object]:
+        """Return (hit, value). Expired entries count as misses."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: tuple, value: object, ttl: float) -> None:
+        """Store value for ttl seconds, evicting least recently used entries."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tenant_id: str, *namespaces: str) -> int:
+        """Drop a tenant's entries (only the given namespaces, if any)."""
+        with self._lock:
+            stale = [
+                key
+                for key in self._entries
+                if key[1] == tenant_id and (not namespaces or key[0] in namespaces)
+            ]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class ByteLRUCache:
+    """Thread-safe LRU cache bounded by the approximate size of its values.
+
+    Sizes are measured as the length of the JSON encoding, which tracks
+    the memory held by parsed API payloads closely enough for a budget.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple, tuple[int, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> tuple[bool, object]:
+        """Return (hit, value) and count the lookup."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return True, entry[1]
+
+    def set(self, key: tuple, value: object) -> None:
+        """Store value, evicting least recently used entries over budget."""
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= old[0]
+            self._entries[key] = (size, value)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (evicted_size, _) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        """Counters for monitoring: hits, misses, evictions, entries, bytes."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+# Singleton caches
+_cache: TTLCache | None = None
+_transcript_cache: ByteLRUCache | None = None
+
+
+def get_cache() -> TTLCache:
+    """Get the aggregate cache (singleton pattern)."""
+    global _cache
+    if _cache is None:
+        _cache = TTLCache(settings.cache_max_entries)
+    return _cache
+
+
+def get_transcript_cache() -> ByteLRUCache:
+    """Get the finished-transcript cache (singleton pattern)."""
+    global _transcript_cache
+    if _transcript_cache is None:
+        _transcript_cache = ByteLRUCache(settings.transcript_cache_bytes)
+    return _transcript_cache
+
+
+def cached(namespace: str, ttl: float):
+    """Cache a function whose first argument is tenant_id.
+
+    Only returned values are cached; exceptions propagate and are not
+    stored. Callers get a copy, so they may modify the result freely.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(tenant_id: str, *args, **kwargs):
+            key = (namespace, tenant_id, args, tuple(sorted(kwargs.items())))
+            cache = get_cache()
+            hit, value = cache.get(key)
+            if not hit:
+                value = func(tenant_id, *args, **kwargs)
+                cache.set(key, value, ttl)
+            return copy.deepcopy(value)
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate_tenant(tenant_id: str, *namespaces: str) -> None:
+    """Drop cached aggregates of a tenant after it changed."""
+    removed = get_cache().invalidate(tenant_id, *namespaces)
+    if settings.debug:
+        print(f"DEBUG cache: dropped {removed} entries for tenant {tenant_id}")
@@ -2,14 +2,20 @@
 
 from components.layout import page_layout
 from components.sidebar import create_sidebar
-from components.kpi_card import kpi_card
-from components.funnel_chart import funnel_chart
+from components.kpi_card import kpi_card, KpiCard
+from components.funnel_chart import funnel_chart, update_funnel_chart
+from components.trend_chart import trend_chart
 from components.chat_viewer import show_chat_dialog
+from components.page_loader import PageLoader
 
 __all__ = [
     "page_layout", 
     "create_sidebar", 
     "kpi_card", 
+    "KpiCard",
     "funnel_chart",
-    "show_chat_dialog"
+    "update_funnel_chart",
+    "trend_chart",
+    "show_chat_dialog",
+    "PageLoader",
 ]
@@ -1,20 +1,68 @@
 """Chat Viewer Dialog component - Telegram style."""
 
+from datetime import datetime
+
 from nicegui import ui
-from data import get_session_history
+from config import settings
+from data import get_transcript_cache_stats
+from data_async import get_session_history
+
+# Messages fetched when the dialog opens and per scroll-up load
+HISTORY_PAGE_SIZE = 50
+
+
+def _message_item(msg: dict) -> dict:
+    """Shape a history row for the virtual scroll template."""
+    time_str = ""
+    if msg.get("created_at"):
+        try:
+            dt = datetime.fromisoformat(msg["created_at"].replace("Z", "+00:00"))
+            time_str = dt.strftime("%H:%M")
+        except ValueError:
+            pass
+    return {
+        "id": msg.get("id"),
+        "is_user": msg.get("role") == "user",
+        "text": msg.get("message", ""),
+        "time": time_str,
+    }
 
 
-def show_chat_dialog(
+def _history_key(msg: dict) -> tuple[str, int]:
+    return (msg["created_at"], msg["id"])
+
+
+async def show_chat_dialog(
     session_id: str,
-    client_name: str = "Клиент",
+    client_name: str | None = None,
     tenant_id: str | None = None,
     summary: str | None = None,
 ) -> None:
+    """Open the chat of a session.
+
+    Summary and client name come with the history in one request;
+    the arguments are only fallbacks.
+    """
     if not tenant_id:
         ui.notify("Ошибка: tenant_id не указан", type="negative")
         return
 
-    history = get_session_history(session_id, tenant_id)
+    # Only the newest page is loaded up front; older pages follow on scroll
+    chat = await get_session_history(session_id, tenant_id, limit=HISTORY_PAGE_SIZE)
+    if settings.debug:
+        print(f"DEBUG transcript cache: {get_transcript_cache_stats()}")
+    history = chat["messages"]
+    client_name = chat["client_name"] or client_name or "Клиент"
+    summary = chat["summary"] or summary
+    state = {
+        "oldest": _history_key(history[0]) if history else None,
+        "exhausted": len(history) < HISTORY_PAGE_SIZE,
+        "loading": False,
+    }
+    items = [_message_item(msg) for msg in history]
+
+    def count_text() -> str:
+        return f"{len(items)}{'' if state['exhausted'] else '+'} сообщений"
 
     # Add CSS for chat bubbles that works in both light and dark mode
     ui.add_head_html("""
@@ -75,7 +123,7 @@ def show_chat_dialog(
                 )
                 with ui.column().classes("gap-0"):
                     ui.label(client_name).classes("text-gray-800 font-bold text-base")
-                    ui.label(f"{len(history)} сообщений").classes(
+                    count_label = ui.label(count_text()).classes(
                         "text-gray-600 text-xs"
                     )
             ui.button(icon="close", on_click=dialog.close).props(
@@ -100,53 +148,65 @@ def show_chat_dialog(
                     "text-gray-400 font-medium"
                 )
         else:
-            # Messages area
-            with ui.scroll_area().classes("h-[400px] w-full p-4 chat-messages-area"):
-                for msg in history:
-                    is_user = msg.get("role") == "user"
-                    time_str = ""
-                    if msg.get("created_at"):
-                        try:
-                            from datetime import datetime
-
-                            dt = datetime.fromisoformat(
-                                msg["created_at"].replace("Z", "+00:00")
-                            )
-                            time_str = dt.strftime("%H:%M")
-                        except:
-                            pass
-
-                    # Message bubble
-                    with ui.row().classes(
-                        f"w-full {'justify-end' if is_user else 'justify-start'} mb-3"
-                    ):
-                        bubble_class = (
-                            "chat-bubble-user" if is_user else "chat-bubble-assistant"
+            # Messages area: Quasar virtual scroll renders only the visible
+            # bubbles from one JSON list, so opening cost does not grow with
+            # the chat length
+            messages_list = (
+                ui.element("q-virtual-scroll")
+                .props('virtual-scroll-item-size="80"')
+                .classes("h-[400px] w-full p-4 chat-messages-area")
+            )
+            messages_list.props["items"] = items
+            messages_list.add_slot(
+                "default",
+                r"""
+                <div :key="props.item.id" class="w-full flex mb-3"
+                    :class="props.item.is_user ? 'justify-end' : 'justify-start'">
+                    <div class="q-card max-w-[85%] p-3"
+                        :class="props.item.is_user ? 'chat-bubble-user' : 'chat-bubble-assistant'"
+                        style="box-shadow: 0 2px 4px rgba(0,0,0,0.1)">
+                        <div class="flex no-wrap gap-2 items-start">
+                            <q-icon v-if="!props.item.is_user" name="smart_toy"
+                                class="text-lg text-purple-500" />
+                            <div style="word-break: break-word">{{ props.item.text }}</div>
+                        </div>
+                        <div v-if="props.item.time" class="text-xs mt-1"
+                            :class="props.item.is_user ? 'chat-time-user' : 'chat-time-assistant'">
+                            {{ props.item.time }}
+                        </div>
+                    </div>
+                </div>
+                """,
+            )
+
+            async def load_older(e):
+                """Prepend the previous page when the user scrolls near the top."""
+                if state["exhausted"] or state["loading"] or e.args.get("index", 0) > 5:
+                    return
+                state["loading"] = True
+                try:
+                    older = (
+                        await get_session_history(
+                            session_id,
+                            tenant_id,
+                            limit=HISTORY_PAGE_SIZE,
+                            before=state["oldest"],
                         )
-                        with (
-                            ui.card()
-                            .classes(f"max-w-[85%] p-3 {bubble_class}")
-                            .style("box-shadow: 0 2px 4px rgba(0,0,0,0.1)")
-                        ):
-                            with ui.column().classes("gap-1"):
-                                # Avatar and message
-                                with ui.row().classes("gap-2 items-start"):
-                                    if not is_user:
-                                        ui.icon("smart_toy").classes(
-                                            "text-lg text-purple-500"
-                                        )
-                                    ui.label(msg.get("message", "")).style(
-                                        "word-break: break-word"
-                                    )
-
-                                # Time stamp
-                                if time_str:
-                                    time_class = (
-                                        "chat-time-user"
-                                        if is_user
-                                        else "chat-time-assistant"
-                                    )
-                                    ui.label(time_str).classes(f"text-xs {time_class}")
+                    )["messages"]
+                finally:
+                    state["loading"] = False
+                state["exhausted"] = len(older) < HISTORY_PAGE_SIZE
+                if older:
+                    state["oldest"] = _history_key(older[0])
+                    items[:0] = [_message_item(msg) for msg in older]
+                    messages_list.update()
+                    # Keep the message the user was looking at in place
+                    messages_list.run_method(
+                        "scrollTo", len(older) + e.args.get("index", 0), "start-force"
+                    )
+                count_label.text = count_text()
+
+            messages_list.on("virtual-scroll", load_older, ["index"])
 
         # Footer
         with (
@@ -159,3 +219,10 @@ def show_chat_dialog(
             )
 
     dialog.open()
+    if history:
+        # Start at the newest message, like a messenger
+        ui.timer(
+            0.1,
+            lambda: messages_list.run_method("scrollTo", len(items) - 1, "end-force"),
+            once=True,
+        )
@@ -3,13 +3,8 @@
 from nicegui import ui
 
 
-def funnel_chart(data: dict) -> None:
-    """
-    ECharts funnel visualization for conversion stages.
-    
-    Args:
-        data: Dict with keys: started, service_selected, staff_selected, time_selected, done
-    """
+def _funnel_stages(data: dict) -> tuple[list[dict], int]:
+    """Series data and scale maximum for the funnel."""
     stages = [
         {"name": "Начали диалог", "value": data.get("started", 0)},
         {"name": "Выбрали услугу", "value": data.get("service_selected", 0)},
@@ -20,11 +15,24 @@ def funnel_chart(data: dict) -> None:
     
     # Calculate percentages for labels
     total = data.get("started", 1) or 1
+    return stages, total
+
+
+def funnel_chart(data: dict) -> ui.echart:
+    """
+    ECharts funnel visualization for conversion stages.
+    
+    Args:
+        data: Dict with keys: started, service_selected, staff_selected, time_selected, done
+    
+    Returns the chart; pass it to update_funnel_chart() to show new data.
+    """
+    stages, total = _funnel_stages(data)
     
     # Lavender Theme Colors (Light to Dark Purple)
     colors = ["#F3E8FF", "#E9D5FF", "#D8B4FE", "#C084FC", "#A855F7"]
     
-    ui.echart({
+    return ui.echart({
         "tooltip": {
             "trigger": "item",
             "formatter": "{b}: {c} ({d}%)"
@@ -66,3 +74,17 @@ def funnel_chart(data: dict) -> None:
             "color": colors
         }]
     }).classes("w-full h-80")
+
+
+def update_funnel_chart(chart: ui.echart, data: dict) -> None:
+    """Show new stage counts on an existing funnel chart.
+
+    Only the series values travel to the browser (ECharts merges them
+    into the current option); the stored options are kept in sync so a
+    reconnecting client renders the same data.
+    """
+    stages, total = _funnel_stages(data)
+    series = chart.options["series"][0]
+    series["data"] = stages
+    series["max"] = total
+    chart.run_chart_method("setOption", {"series": [{"data": stages, "max": total}]})
@@ -2,6 +2,43 @@
 
 from nicegui import ui
 
+DELTA_STYLES = {
+    True: ("text-green-600 dark:text-green-400", "bg-green-50 dark:bg-green-900/20", "arrow_upward"),
+    False: ("text-red-600 dark:text-red-400", "bg-red-50 dark:bg-red-900/20", "arrow_downward"),
+}
+
+
+class KpiCard:
+    """Handle of a rendered KPI card, for updating it in place.
+
+    set_value() only changes the texts and classes of the existing
+    elements, so a refresh sends a few props instead of a new card.
+    """
+
+    def __init__(self, value_label: ui.label, delta_row: ui.row, delta_icon: ui.icon, delta_label: ui.label):
+        self.value_label = value_label
+        self.delta_row = delta_row
+        self.delta_icon = delta_icon
+        self.delta_label = delta_label
+
+    def set_value(
+        self,
+        value: str | int | float,
+        delta: str | None = None,
+        delta_positive: bool = True
+    ) -> None:
+        """Show a new value (and delta) on the existing card."""
+        self.value_label.set_text(str(value))
+        
+        self.delta_row.set_visibility(bool(delta))
+        if delta:
+            color_text, color_bg, icon_name = DELTA_STYLES[delta_positive]
+            self.delta_row.classes(replace=f"items-center gap-1 mt-2 px-2 py-1 rounded-md {color_bg} self-start")
+            self.delta_icon.set_name(icon_name)
+            self.delta_icon.classes(replace=f"text-xs {color_text}")
+            self.delta_label.set_text(delta)
+            self.delta_label.classes(replace=f"text-xs font-medium {color_text}")
+
 
 def kpi_card(
     title: str, 
@@ -9,9 +46,11 @@ def kpi_card(
     icon: str = "info",
     delta: str | None = None,
     delta_positive: bool = True
-) -> None:
+) -> KpiCard:
     """
     KPI Card component with icon, value, and optional delta indicator.
+    
+    Returns a KpiCard handle; call its set_value() to update the card.
     """
     card = ui.card().classes("w-full p-4 rounded-xl theme-card shadow-sm transition-all hover:shadow-md")
     with card:
@@ -23,14 +62,13 @@ def kpi_card(
                 ui.icon(icon).classes("text-lg text-purple-600 dark:text-purple-400")
         
         # Value
-        ui.label(value).classes("text-3xl font-bold tracking-tight mb-1")
+        value_label = ui.label(value).classes("text-3xl font-bold tracking-tight mb-1")
         
-        # Delta indicator
-        if delta:
-            color_text = "text-green-600 dark:text-green-400" if delta_positive else "text-red-600 dark:text-red-400"
-            color_bg = "bg-green-50 dark:bg-green-900/20" if delta_positive else "bg-red-50 dark:bg-red-900/20"
-            icon_name = "arrow_upward" if delta_positive else "arrow_downward"
-            
-            with ui.row().classes(f"items-center gap-1 mt-2 px-2 py-1 rounded-md {color_bg} self-start"):
-                ui.icon(icon_name).classes(f"text-xs {color_text}")
-                ui.label(delta).classes(f"text-xs font-medium {color_text}")
+        # Delta indicator (always built, hidden without a delta, so updates can show it)
+        with ui.row() as delta_row:
+            delta_icon = ui.icon("arrow_upward")
+            delta_label = ui.label()
+    
+    handle = KpiCard(value_label, delta_row, delta_icon, delta_label)
+    handle.set_value(value, delta, delta_positive)
+    return handle
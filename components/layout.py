@@ -126,9 +126,10 @@ def page_layout(title: str):
             user_role = app.storage.user.get("role", "")
             
             if user_role == "super_admin":
-                from data import get_tenants  # Lazy import
+                from data import get_tenants, refresh_tenants  # Lazy import
                 
                 try:
+                    # Shared directory: no round trip unless its TTL expired
                     tenants = get_tenants()
                     options = {str(t["id"]): t.get("name") or "Unnamed Salon" for t in tenants}
                     current_tenant = app.storage.user.get("tenant_id")
@@ -137,6 +138,11 @@ def page_layout(title: str):
                     if current_tenant:
                         current_tenant = str(current_tenant)
                     
+                    # Unknown tenant may be newer than the directory, reload once
+                    if current_tenant and current_tenant not in options:
+                        tenants = refresh_tenants()
+                        options = {str(t["id"]): t.get("name") or "Unnamed Salon" for t in tenants}
+                    
                     # Validate that current_tenant exists in available options
                     # If not (e.g., old session with deleted tenant), reset to first available
                     if current_tenant and current_tenant not in options:
@@ -0,0 +1,87 @@
+"""Concurrent page data loader.
+
+A page declares its widgets (a query plus a render function), then runs
+them all at once under one deadline. Each widget renders as soon as its
+own result arrives; a widget whose query fails or misses the deadline
+shows a placeholder instead of holding up the rest of the page.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from nicegui import ui
+
+from config import settings
+
+
+def loading_placeholder() -> None:
+    """Spinner shown while a widget's query runs."""
+    with ui.row().classes("w-full col-span-full justify-center py-8"):
+        ui.spinner("dots", size="lg", color="purple")
+
+
+def error_placeholder() -> None:
+    """Shown instead of a widget whose query failed or timed out."""
+    with ui.column().classes("w-full col-span-full items-center py-8 gap-2"):
+        ui.icon("cloud_off").classes("text-4xl text-gray-400")
+        ui.label("Не удалось загрузить данные").classes("text-grey text-sm")
+
+
+class PageLoader:
+    """Runs the queries of a page's widgets concurrently."""
+
+    def __init__(self, timeout: float | None = None):
+        self.timeout = timeout if timeout is not None else settings.page_load_timeout
+        self._widgets: list[dict] = []
+
+    def add(
+        self,
+        fetch: Callable[[], Awaitable[Any]],
+        render: Callable[[Any], None],
+        container: ui.element | None = None,
+        name: str = "widget",
+    ) -> "PageLoader":
+        """Declare a widget.
+
+        Args:
+            fetch: Zero-argument coroutine function running the query. It
+                must raise on failure (the data_async load_* functions), or
+                the placeholder never shows
+            render: Called with the query result
+            container: If given, it is cleared and holds the spinner, the
+                rendered widget or the error placeholder
+            name: Used in error logs
+        """
+        self._widgets.append(
+            {"fetch": fetch, "render": render, "container": container, "name": name}
+        )
+        return self
+
+    async def run(self) -> None:
+        """Load every widget; returns when all have rendered or given up."""
+        for widget in self._widgets:
+            if widget["container"] is not None:
+                widget["container"].clear()
+                with widget["container"]:
+                    loading_placeholder()
+
+        await asyncio.gather(*(self._load(**widget) for widget in self._widgets))
+
+    async def _load(self, fetch, render, container, name) -> None:
+        try:
+            result = await asyncio.wait_for(fetch(), timeout=self.timeout)
+        except Exception as e:
+            reason = "timed out" if isinstance(e, asyncio.TimeoutError) else e
+            print(f"Error loading {name}: {reason}")
+            if container is not None:
+                container.clear()
+                with container:
+                    error_placeholder()
+            return
+
+        if container is None:
+            render(result)
+            return
+        container.clear()
+        with container:
+            render(result)
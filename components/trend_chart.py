@@ -0,0 +1,62 @@
+"""Trend Chart component using ECharts."""
+
+from nicegui import ui
+
+
+def trend_chart(data: dict) -> None:
+    """
+    ECharts line/bar chart of sessions, bookings and conversion over time.
+    
+    Args:
+        data: Dict with keys: bucket ("day" | "week" | "month"),
+              points (list of dicts with period, sessions, bookings, conversion)
+    """
+    points = data.get("points", [])
+    if not points:
+        ui.label("Нет данных").classes("text-grey")
+        return
+    
+    # Axis labels per bucket: 12.01 / с 12.01 / 01.2025
+    bucket = data.get("bucket", "day")
+    labels = []
+    for point in points:
+        year, month, day = point["period"][:10].split("-")
+        if bucket == "month":
+            labels.append(f"{month}.{year}")
+        elif bucket == "week":
+            labels.append(f"с {day}.{month}")
+        else:
+            labels.append(f"{day}.{month}")
+    
+    ui.echart({
+        "tooltip": {"trigger": "axis"},
+        "legend": {"data": ["Сессии", "Записи", "Конверсия"], "bottom": 0},
+        "grid": {"left": 40, "right": 50, "top": 20, "bottom": 50},
+        "xAxis": {"type": "category", "data": labels},
+        "yAxis": [
+            {"type": "value", "minInterval": 1},
+            {"type": "value", "axisLabel": {"formatter": "{value}%"}, "splitLine": {"show": False}},
+        ],
+        "series": [
+            {
+                "name": "Сессии",
+                "type": "bar",
+                "data": [p["sessions"] for p in points],
+                "itemStyle": {"color": "#D8B4FE", "borderRadius": [4, 4, 0, 0]},
+            },
+            {
+                "name": "Записи",
+                "type": "bar",
+                "data": [p["bookings"] for p in points],
+                "itemStyle": {"color": "#A855F7", "borderRadius": [4, 4, 0, 0]},
+            },
+            {
+                "name": "Конверсия",
+                "type": "line",
+                "yAxisIndex": 1,
+                "smooth": True,
+                "data": [p["conversion"] for p in points],
+                "itemStyle": {"color": "#6B21A8"},
+            },
+        ],
+    }).classes("w-full h-80")
@@ -19,6 +19,24 @@ class Settings(BaseSettings):
     
     # Optional
     debug: bool = False
+    
+    # Data access
+    db_max_workers: int = 16  # Threads serving blocking Supabase calls
+    exact_count_threshold: int = 10000  # Above this, list totals are estimated
+    cache_max_entries: int = 1024  # LRU bound of the aggregate cache
+    transcript_cache_bytes: int = 32 * 1024 * 1024  # Memory budget of finished chats
+    tenant_directory_ttl: int = 60  # Seconds before the tenant list is reloaded
+    page_load_timeout: float = 10.0  # Deadline for a page's concurrent queries
+    live_refresh_interval: float = 30.0  # Seconds between live dashboard pushes
+    wishlist_feed: str = "realtime"  # Change source: "realtime" (Supabase) or "local"
+    
+    # Auth
+    password_workers: int = 0  # bcrypt threads, 0 = one per CPU core
+    
+    # Metrics collector job
+    collector_workers: int = 8  # Tenants processed concurrently
+    collector_timeout: float = 30.0  # Seconds per tenant attempt
+    collector_retries: int = 3  # Attempts per tenant
 
 
 settings = Settings()
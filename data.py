@@ -1,11 +1,30 @@
 """Data Access Layer for Supabase."""
 
+import copy
+import threading
+import time
+
+import httpx
 from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
 from config import settings
+from cache import cached, get_transcript_cache, invalidate_tenant
 
 # Singleton Supabase client
 _supabase: Client | None = None
 
+# Singleton Supabase client bound to the dashboard schema
+_dashboard_db: Client | None = None
+
+# Singleton pooled HTTP client for raw /rest/v1/rpc calls
+_rpc_client: httpx.Client | None = None
+_rpc_client_lock = threading.Lock()
+
+# Process-wide tenant directory for the header selector (see get_tenants)
+_tenant_directory: list[dict] | None = None
+_tenant_directory_expires_at = 0.0
+_tenant_directory_lock = threading.Lock()
+
 
 def get_supabase() -> Client:
     """Get Supabase client (singleton pattern)."""
@@ -25,6 +44,101 @@ def get_supabase() -> Client:
     return _supabase
 
 
+def get_dashboard_db() -> Client:
+    """Get Supabase client for the dashboard schema (singleton pattern).
+
+    Kept apart from get_supabase(): switching schemas on the shared client
+    would leak into concurrent queries on public tables.
+    """
+    global _dashboard_db
+    if _dashboard_db is None:
+        _dashboard_db = create_client(
+            settings.supabase_url,
+            settings.supabase_service_key,
+            options=ClientOptions(schema="dashboard"),
+        )
+    return _dashboard_db
+
+
+def get_rpc_client() -> httpx.Client:
+    """Get pooled HTTP/2 client for raw RPC calls (singleton pattern).
+
+    Connections are kept alive between calls, so user management requests
+    skip the TCP+TLS handshake. Opened on app startup, closed on shutdown
+    (see main.py); created lazily if used before startup.
+    """
+    global _rpc_client
+    with _rpc_client_lock:
+        if _rpc_client is None or _rpc_client.is_closed:
+            _rpc_client = httpx.Client(
+                base_url=f"{settings.supabase_url}/rest/v1/rpc",
+                headers={
+                    "apikey": settings.supabase_service_key,
+                    "Authorization": f"Bearer {settings.supabase_service_key}",
+                },
+                http2=True,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                timeout=httpx.Timeout(10.0),
+            )
+        return _rpc_client
+
+
+def close_rpc_client() -> None:
+    """Close the pooled RPC client and its connections."""
+    global _rpc_client
+    with _rpc_client_lock:
+        if _rpc_client is not None:
+            _rpc_client.close()
+            _rpc_client = None
+
+
+def _call_rpc(function_name: str, params: dict | None = None) -> httpx.Response:
+    """POST to /rest/v1/rpc/<function_name> over the pooled client."""
+    return get_rpc_client().post(f"/{function_name}", json=params)
+
+
+def _count_method(count_mode: str | None) -> str | None:
+    """PostgREST count method to request for a count mode.
+
+    "auto" starts from the planner estimate, see _resolve_count.
+    """
+    return "planned" if count_mode == "auto" else count_mode
+
+
+def _resolve_count(
+    count: int | None, count_mode: str | None, exact_query
+) -> tuple[int | None, bool]:
+    """Turn the count returned by PostgREST into (total, approximate).
+
+    In "auto" mode a planner estimate at or above
+    settings.exact_count_threshold is returned as is. Smaller sets are
+    re-counted exactly with `exact_query`, which is cheap at that size.
+    approximate is True when the total is an estimate.
+    """
+    if not count_mode:
+        return None, False
+    count = count or 0
+    if count_mode == "auto" and count < settings.exact_count_threshold:
+        return exact_query().execute().count or 0, False
+    return count, count_mode != "exact"
+
+
+def _report_rpc_error(error: Exception, function_name: str, sql_file: str) -> None:
+    """Print setup instructions if an RPC function is not deployed yet."""
+    if "PGRST202" not in str(error):
+        return
+
+    print("=" * 60)
+    print("❌ RPC FUNCTION NOT FOUND!")
+    print("=" * 60)
+    print(f"The function '{function_name}' doesn't exist.")
+    print("\n📝 To fix:")
+    print("1. Open Supabase → SQL Editor")
+    print(f"2. Run the SQL from: {sql_file}")
+    print("3. Restart this dashboard")
+    print("=" * 60)
+
+
 # ============================================================
 # Auth Queries
 # ============================================================
@@ -45,19 +159,8 @@ def get_user_by_email(email: str) -> dict | None:
         return response.data
 
     except Exception as e:
-        error_msg = str(e)
-
         # Check for common errors
-        if "PGRST202" in error_msg:
-            print("=" * 60)
-            print("❌ RPC FUNCTION NOT FOUND!")
-            print("=" * 60)
-            print("The function 'get_dashboard_user_by_email' doesn't exist.")
-            print("\n📝 To fix:")
-            print("1. Open Supabase → SQL Editor")
-            print("2. Run the SQL from: db/rpc_user_management.sql")
-            print("3. Restart this dashboard")
-            print("=" * 60)
+        _report_rpc_error(e, "get_dashboard_user_by_email", "db/rpc_user_management.sql")
 
         print(f"Error fetching user: {e}")
         import traceback
@@ -66,13 +169,27 @@ def get_user_by_email(email: str) -> dict | None:
         return None
 
 
-def get_tenants() -> list[dict]:
+def get_tenants(refresh: bool = False) -> list[dict]:
     """Get all tenants for super_admin tenant selector.
 
+    Served from a process-wide directory that is reloaded after
+    settings.tenant_directory_ttl seconds or when refresh=True.
+    get_tenant_settings and update_tenant_metadata keep it in sync.
+
     WARNING: This returns ALL tenants without filtering.
     Should only be called from layout.py tenant selector which
     already verifies user_role == 'super_admin'.
     """
+    global _tenant_directory, _tenant_directory_expires_at
+
+    with _tenant_directory_lock:
+        if (
+            not refresh
+            and _tenant_directory is not None
+            and time.monotonic() < _tenant_directory_expires_at
+        ):
+            return [dict(t) for t in _tenant_directory]
+
     try:
         sb = get_supabase()
         if settings.debug:
@@ -80,13 +197,43 @@ def get_tenants() -> list[dict]:
         response = sb.table("tenants_v2").select("id, name").order("name").execute()
         if settings.debug:
             print(f"DEBUG get_tenants: response.data = {response.data}")
-        return response.data or []
+
+        with _tenant_directory_lock:
+            _tenant_directory = response.data or []
+            _tenant_directory_expires_at = (
+                time.monotonic() + settings.tenant_directory_ttl
+            )
+            return [dict(t) for t in _tenant_directory]
     except Exception as e:
         print(f"Error fetching tenants: {e}")
         import traceback
 
         traceback.print_exc()
-        return []
+
+        # A stale directory is better than an empty selector
+        with _tenant_directory_lock:
+            return [dict(t) for t in _tenant_directory or []]
+
+
+def refresh_tenants() -> list[dict]:
+    """Reload the tenant directory from the database."""
+    return get_tenants(refresh=True)
+
+
+def _update_tenant_directory(tenant: dict) -> None:
+    """Patch one tenant's entry in the directory from a fresh tenants_v2 row."""
+    with _tenant_directory_lock:
+        if _tenant_directory is None or "id" not in tenant:
+            return
+
+        entry = {"id": tenant["id"], "name": tenant.get("name")}
+        for i, existing in enumerate(_tenant_directory):
+            if str(existing["id"]) == str(entry["id"]):
+                _tenant_directory[i] = entry
+                break
+        else:
+            _tenant_directory.append(entry)
+        _tenant_directory.sort(key=lambda t: t.get("name") or "")
 
 
 def get_tenant_settings(tenant_id: str) -> dict | None:
@@ -102,6 +249,8 @@ def get_tenant_settings(tenant_id: str) -> dict | None:
             print(
                 f"DEBUG get_tenant_settings: response.data = {response.data is not None}"
             )
+        if response.data:
+            _update_tenant_directory(response.data)
         return response.data
     except Exception as e:
         print(f"Error fetching tenant settings: {e}")
@@ -145,6 +294,8 @@ def update_tenant_metadata(
             .eq("id", tenant_id)
             .execute()
         )
+        for row in response.data:
+            _update_tenant_directory(row)
         return len(response.data) > 0
     except Exception as e:
         print(f"Error updating tenant metadata: {e}")
@@ -161,56 +312,130 @@ def get_kpi_summary(
 ) -> dict:
     """Get KPI summary for date range.
 
+    Closed days are read from the dashboard.metrics_dailies rollups written
+    by jobs/metrics_collector.py. Open days (today onwards) and closed days
+    without a rollup row are aggregated live by the get_dashboard_kpi_summary
+    RPC (see db/rpc_dashboard_metrics.sql). Wide ranges therefore cost one
+    rollup read plus a live query for the tail.
+
     Args:
         tenant_id: Tenant UUID
         date_from: Start date (YYYY-MM-DD), defaults to 7 days ago
         date_to: End date (YYYY-MM-DD), defaults to today
     """
     try:
-        from datetime import date, timedelta
+        return load_kpi_summary(tenant_id, date_from, date_to)
+    except Exception as e:
+        _report_rpc_error(e, "get_dashboard_kpi_summary", "db/rpc_dashboard_metrics.sql")
+        print(f"Error fetching KPI: {e}")
+        return {
+            "sessions": 0,
+            "bookings": 0,
+            "conversion": 0,
+            "revenue": 0,
+            "avg_response_ms": 0,
+        }
 
-        sb = get_supabase()
 
-        # Default to last 7 days if not specified
-        if not date_from:
-            date_from = (date.today() - timedelta(days=7)).isoformat()
-        if not date_to:
-            date_to = date.today().isoformat()
+def load_kpi_summary(
+    tenant_id: str, date_from: str | None = None, date_to: str | None = None
+) -> dict:
+    """Like get_kpi_summary, but raises on errors (for PageLoader)."""
+    from datetime import date, timedelta
+
+    # Default to last 7 days if not specified
+    if not date_from:
+        date_from = (date.today() - timedelta(days=7)).isoformat()
+    if not date_to:
+        date_to = date.today().isoformat()
+
+    return _fetch_kpi_summary(tenant_id, date_from, date_to)
 
-        # Total sessions
-        sessions = (
-            sb.table("conversation_sessions_v2")
-            .select("id", count="exact")
-            .eq("tenant_id", tenant_id)
-            .gte("started_at", date_from)
-            .lte("started_at", date_to + "T23:59:59")
-            .execute()
-        )
 
-        # Bookings (booking_id NOT NULL)
-        bookings = (
-            sb.table("conversation_sessions_v2")
-            .select("id, booking_amount", count="exact")
+@cached("kpi_summary", ttl=60)
+def _fetch_kpi_summary(tenant_id: str, date_from: str, date_to: str) -> dict:
+    """Merge rollups of closed days with a live aggregate of the rest.
+
+    Raises on errors so failures are never cached.
+    """
+    from datetime import date, timedelta
+
+    start = date.fromisoformat(date_from)
+    end = date.fromisoformat(date_to)
+    last_closed = min(end, date.today() - timedelta(days=1))
+
+    # Latency is summed as avg * count so days can be merged into one average
+    totals = {"sessions": 0, "bookings": 0, "revenue": 0.0, "responses": 0, "response_ms": 0}
+    live_days = {start + timedelta(days=n) for n in range((end - start).days + 1)}
+
+    if start <= last_closed:
+        rollups = (
+            get_dashboard_db()
+            .table("metrics_dailies")
+            .select("day, dialogs_started, bookings, revenue, response_count, avg_response_ms")
             .eq("tenant_id", tenant_id)
-            .gte("started_at", date_from)
-            .lte("started_at", date_to + "T23:59:59")
-            .not_.is_("booking_id", "null")
+            .gte("day", start.isoformat())
+            .lte("day", last_closed.isoformat())
             .execute()
         )
-
-        total = sessions.count or 0
-        booked = bookings.count or 0
-        revenue = sum(float(b.get("booking_amount") or 0) for b in bookings.data)
-
-        return {
-            "sessions": total,
-            "bookings": booked,
-            "conversion": round(booked / total * 100, 1) if total else 0,
-            "revenue": revenue,
-        }
-    except Exception as e:
-        print(f"Error fetching KPI: {e}")
-        return {"sessions": 0, "bookings": 0, "conversion": 0, "revenue": 0}
+        for row in rollups.data or []:
+            totals["sessions"] += int(row.get("dialogs_started") or 0)
+            totals["bookings"] += int(row.get("bookings") or 0)
+            totals["revenue"] += float(row.get("revenue") or 0)
+            responses = int(row.get("response_count") or 0)
+            totals["responses"] += responses
+            totals["response_ms"] += int(row.get("avg_response_ms") or 0) * responses
+            live_days.discard(date.fromisoformat(row["day"]))
+
+    for range_start, range_end in _day_ranges(live_days):
+        kpi = _query_kpi_summary(tenant_id, range_start.isoformat(), range_end.isoformat())
+        totals["sessions"] += kpi["sessions"]
+        totals["bookings"] += kpi["bookings"]
+        totals["revenue"] += kpi["revenue"]
+        totals["responses"] += kpi["responses"]
+        totals["response_ms"] += kpi["avg_response_ms"] * kpi["responses"]
+
+    sessions, booked = totals["sessions"], totals["bookings"]
+    responses = totals["responses"]
+    return {
+        "sessions": sessions,
+        "bookings": booked,
+        "conversion": round(booked / sessions * 100, 1) if sessions else 0,
+        "revenue": totals["revenue"],
+        "avg_response_ms": round(totals["response_ms"] / responses) if responses else 0,
+    }
+
+
+def _query_kpi_summary(tenant_id: str, date_from: str, date_to: str) -> dict:
+    """Aggregate KPIs live from conversation_sessions_v2 via RPC."""
+    sb = get_supabase()
+    response = sb.rpc(
+        "get_dashboard_kpi_summary",
+        {"p_tenant_id": tenant_id, "p_date_from": date_from, "p_date_to": date_to},
+    ).execute()
+
+    kpi = response.data or {}
+    return {
+        "sessions": int(kpi.get("sessions") or 0),
+        "bookings": int(kpi.get("bookings") or 0),
+        "conversion": float(kpi.get("conversion") or 0),
+        "revenue": float(kpi.get("revenue") or 0),
+        "responses": int(kpi.get("responses") or 0),
+        "avg_response_ms": int(kpi.get("avg_response_ms") or 0),
+    }
+
+
+def _day_ranges(days) -> list[tuple]:
+    """Group dates into consecutive (first, last) ranges."""
+    from datetime import timedelta
+
+    ranges = []
+    for day in sorted(days):
+        if ranges and day == ranges[-1][1] + timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
 
 
 def get_funnel_data(
@@ -226,56 +451,14 @@ def get_funnel_data(
     - "done" = actually booked (booking_id IS NOT NULL)
 
     Non-booking intents (inquiry, canceled, etc.) don't count toward funnel progression.
+
+    Counted in Postgres by the get_dashboard_funnel RPC
+    (see db/rpc_dashboard_metrics.sql).
     """
     try:
-        from datetime import date, timedelta
-
-        sb = get_supabase()
-
-        # Default to last 7 days if not specified
-        if not date_from:
-            date_from = (date.today() - timedelta(days=7)).isoformat()
-        if not date_to:
-            date_to = date.today().isoformat()
-
-        # Include booking_id to determine actual bookings
-        result = (
-            sb.table("conversation_sessions_v2")
-            .select("meta, final_status, booking_id")
-            .eq("tenant_id", tenant_id)
-            .gte("started_at", date_from)
-            .lte("started_at", date_to + "T23:59:59")
-            .execute()
-        )
-
-        # Initialize counters
-        stages = {
-            "started": 0,
-            "service_selected": 0,
-            "staff_selected": 0,
-            "time_selected": 0,
-            "done": 0,
-        }
-
-        for row in result.data:
-            stages["started"] += 1
-            meta = row.get("meta") or {}
-            drop = meta.get("drop_off_stage")
-            booking_id = row.get("booking_id")
-
-            if booking_id is not None:
-                stages["done"] += 1
-                stages["time_selected"] += 1
-                stages["staff_selected"] += 1
-                stages["service_selected"] += 1
-            elif drop == "time_selection":
-                stages["staff_selected"] += 1
-                stages["service_selected"] += 1
-            elif drop == "staff_selection":
-                stages["service_selected"] += 1
-
-        return stages
+        return load_funnel_data(tenant_id, date_from, date_to)
     except Exception as e:
+        _report_rpc_error(e, "get_dashboard_funnel", "db/rpc_dashboard_metrics.sql")
         print(f"Error fetching funnel: {e}")
         return {
             "started": 0,
@@ -286,6 +469,150 @@ def get_funnel_data(
         }
 
 
+def load_funnel_data(
+    tenant_id: str, date_from: str | None = None, date_to: str | None = None
+) -> dict:
+    """Like get_funnel_data, but raises on errors (for PageLoader)."""
+    from datetime import date, timedelta
+
+    # Default to last 7 days if not specified
+    if not date_from:
+        date_from = (date.today() - timedelta(days=7)).isoformat()
+    if not date_to:
+        date_to = date.today().isoformat()
+
+    return _fetch_funnel_data(tenant_id, date_from, date_to)
+
+
+@cached("funnel", ttl=60)
+def _fetch_funnel_data(tenant_id: str, date_from: str, date_to: str) -> dict:
+    """Run the funnel RPC. Raises on errors so failures are never cached."""
+    sb = get_supabase()
+    response = sb.rpc(
+        "get_dashboard_funnel",
+        {"p_tenant_id": tenant_id, "p_date_from": date_from, "p_date_to": date_to},
+    ).execute()
+
+    counts = response.data or {}
+    return {
+        "started": int(counts.get("started") or 0),
+        "service_selected": int(counts.get("service_selected") or 0),
+        "staff_selected": int(counts.get("staff_selected") or 0),
+        "time_selected": int(counts.get("time_selected") or 0),
+        "done": int(counts.get("done") or 0),
+    }
+
+
+def _trend_bucket(start, end) -> str:
+    """Pick the trend granularity so the chart stays at a few dozen points."""
+    days = (end - start).days + 1
+    if days <= 62:
+        return "day"
+    if days <= 366:
+        return "week"
+    return "month"
+
+
+def get_metrics_trend(
+    tenant_id: str, date_from: str | None = None, date_to: str | None = None
+) -> dict:
+    """Get sessions/bookings/conversion over time for the overview chart.
+
+    Read from the dashboard.metrics_dailies rollups and bucketed in Postgres
+    by the get_dashboard_metrics_trend RPC (see db/rpc_dashboard_metrics.sql):
+    daily up to two months, weekly up to a year, monthly beyond that.
+    The RPC reads closed days only; today's live numbers (see
+    _fetch_kpi_summary) are added to the bucket that contains it.
+
+    Returns:
+        {"bucket": "day" | "week" | "month", "points": [{period, sessions, bookings, conversion}]}
+    """
+    try:
+        return load_metrics_trend(tenant_id, date_from, date_to)
+    except Exception as e:
+        _report_rpc_error(e, "get_dashboard_metrics_trend", "db/rpc_dashboard_metrics.sql")
+        print(f"Error fetching metrics trend: {e}")
+        return {"bucket": "day", "points": []}
+
+
+def load_metrics_trend(
+    tenant_id: str, date_from: str | None = None, date_to: str | None = None
+) -> dict:
+    """Like get_metrics_trend, but raises on errors (for PageLoader)."""
+    from datetime import date, timedelta
+
+    # Default to last 7 days if not specified
+    if not date_from:
+        date_from = (date.today() - timedelta(days=7)).isoformat()
+    if not date_to:
+        date_to = date.today().isoformat()
+
+    start, end = date.fromisoformat(date_from), date.fromisoformat(date_to)
+    trend = _fetch_metrics_trend(tenant_id, date_from, date_to, _trend_bucket(start, end))
+    if start <= date.today() <= end:
+        trend = _with_live_day(trend, tenant_id, date.today())
+    return trend
+
+
+def _with_live_day(trend: dict, tenant_id: str, day) -> dict:
+    """Add the live KPIs of a day without a rollup to its trend bucket.
+
+    Returns a new dict, the cached trend is left untouched.
+    """
+    from datetime import timedelta
+
+    # Same bucket starts as date_trunc in get_dashboard_metrics_trend
+    if trend["bucket"] == "week":
+        period = day - timedelta(days=day.weekday())
+    elif trend["bucket"] == "month":
+        period = day.replace(day=1)
+    else:
+        period = day
+
+    kpi = _fetch_kpi_summary(tenant_id, day.isoformat(), day.isoformat())
+    points = []
+    for point in trend["points"]:
+        if point["period"] == period.isoformat():
+            sessions = point["sessions"] + kpi["sessions"]
+            bookings = point["bookings"] + kpi["bookings"]
+            point = {
+                **point,
+                "sessions": sessions,
+                "bookings": bookings,
+                "conversion": round(bookings / sessions * 100, 1) if sessions else 0,
+            }
+        points.append(point)
+    return {**trend, "points": points}
+
+
+@cached("metrics_trend", ttl=300)
+def _fetch_metrics_trend(tenant_id: str, date_from: str, date_to: str, bucket: str) -> dict:
+    """Run the trend RPC. Raises on errors so failures are never cached."""
+    sb = get_supabase()
+    response = sb.rpc(
+        "get_dashboard_metrics_trend",
+        {
+            "p_tenant_id": tenant_id,
+            "p_date_from": date_from,
+            "p_date_to": date_to,
+            "p_bucket": bucket,
+        },
+    ).execute()
+
+    return {
+        "bucket": bucket,
+        "points": [
+            {
+                "period": row["period"],
+                "sessions": int(row.get("sessions") or 0),
+                "bookings": int(row.get("bookings") or 0),
+                "conversion": float(row.get("conversion") or 0),
+            }
+            for row in response.data or []
+        ],
+    }
+
+
 # ============================================================
 # Sessions Queries
 # ============================================================
@@ -298,12 +625,31 @@ def get_sessions(
     status_filter: str | None = None,
     date_from: str | None = None,
     date_to: str | None = None,
-) -> tuple[list[dict], int]:
-    """Get sessions with filters and pagination. Returns (data, total_count)."""
+    after: tuple[str, int] | None = None,
+    before: tuple[str, int] | None = None,
+    count_mode: str | None = "exact",
+    descending: bool = True,
+) -> tuple[list[dict], int | None, bool]:
+    """Get sessions with filters and pagination.
+
+    Returns (data, total_count, approximate).
+
+    Rows are ordered by (started_at, id), newest first unless descending is
+    False. Pass the key of the last row of the current page as `after` to get
+    the next page, or the key of the first row as `before` to get the
+    previous one. Keyset pages cost the same at any depth; `offset` is only
+    used when no cursor is given. The index on (tenant_id, started_at, id)
+    serves both directions.
+
+    count_mode is "exact", "planned", "estimated" (PostgREST count methods),
+    "auto" (exact only below settings.exact_count_threshold) or None to skip
+    counting, in which case total_count is None. approximate is True when
+    total_count is an estimate rather than an exact count.
+    """
     # Validate tenant_id
     if not tenant_id:
         print("⚠️  WARNING: get_sessions called with empty tenant_id")
-        return [], 0
+        return [], 0, False
 
     try:
         import uuid
@@ -312,67 +658,139 @@ def get_sessions(
         uuid.UUID(tenant_id)
     except (ValueError, AttributeError) as e:
         print(f"⚠️  ERROR: Invalid tenant_id format: {tenant_id} ({e})")
-        return [], 0
+        return [], 0, False
 
     try:
         sb = get_supabase()
 
-        query = (
-            sb.table("conversation_sessions_v2")
-            .select("*, clients_v2(full_name)", count="exact")
-            .eq("tenant_id", tenant_id)
-            .order("started_at", desc=True)
-            .range(offset, offset + limit - 1)
+        def filtered(columns: str, count: str | None = None):
+            query = (
+                sb.table("conversation_sessions_v2")
+                .select(columns, count=count)
+                .eq("tenant_id", tenant_id)
+            )
+            if status_filter and status_filter != "all":
+                query = query.eq("final_status", status_filter)
+            if date_from:
+                query = query.gte("started_at", date_from)
+            if date_to:
+                query = query.lte("started_at", date_to + "T23:59:59")
+            return query
+
+        # The total covers the whole filtered set, so it can ride along with
+        # the page only when no cursor narrows the query
+        cursor = after or before
+        query = filtered(
+            "*, clients_v2(full_name)", None if cursor else _count_method(count_mode)
         )
 
-        if status_filter and status_filter != "all":
-            query = query.eq("final_status", status_filter)
-        if date_from:
-            query = query.gte("started_at", date_from)
-        if date_to:
-            query = query.lte("started_at", date_to + "T23:59:59")
+        def seek(query, key: tuple[str, int], desc: bool):
+            """Rows strictly past key in (started_at, id) order."""
+            started_at, row_id = key
+            op = "lt" if desc else "gt"
+            return (
+                query.or_(
+                    f'started_at.{op}."{started_at}",'
+                    f'and(started_at.eq."{started_at}",id.{op}.{int(row_id)})'
+                )
+                .order("started_at", desc=desc)
+                .order("id", desc=desc)
+                .limit(limit)
+            )
+
+        if after:
+            query = seek(query, after, descending)
+        elif before:
+            # Walk backwards in the opposite order, then restore display order
+            query = seek(query, before, not descending)
+        else:
+            query = (
+                query.order("started_at", desc=descending)
+                .order("id", desc=descending)
+                .range(offset, offset + limit - 1)
+            )
 
         response = query.execute()
-        return response.data or [], response.count or 0
+        rows = response.data or []
+        if before:
+            rows.reverse()
+
+        count = response.count
+        if cursor and count_mode:
+            count = filtered("id", _count_method(count_mode)).limit(1).execute().count
+        total, approximate = _resolve_count(
+            count, count_mode, lambda: filtered("id", "exact").limit(1)
+        )
+        return rows, total, approximate
     except Exception as e:
         print(f"Error fetching sessions: {e}")
         import traceback
 
         traceback.print_exc()
-        return [], 0
+        return [], 0, False
+
+
+def get_session_history(
+    session_id: str,
+    tenant_id: str,
+    limit: int | None = None,
+    before: tuple[str, int] | None = None,
+) -> dict:
+    """Get a session's messages plus its summary and client name.
 
+    One round trip: the get_dashboard_session_history RPC (see
+    db/rpc_dashboard_metrics.sql) checks that the session belongs to the
+    tenant and returns everything the chat viewer shows.
+
+    Messages come oldest first. With `limit`, only the newest `limit`
+    messages are returned; pass the (created_at, id) key of the oldest
+    loaded message as `before` to page further back in time.
+
+    Pages of finished sessions are kept in the transcript cache (see
+    cache.ByteLRUCache), since they cannot change any more.
+
+    Returns:
+        {"summary": str | None, "client_name": str | None, "messages": [...]}
+    """
+    empty = {"summary": None, "client_name": None, "messages": []}
+    transcripts = get_transcript_cache()
+    key = (tenant_id, session_id, limit, tuple(before) if before else None)
+    hit, chat = transcripts.get(key)
+    if hit:
+        return copy.deepcopy(chat)
 
-def get_session_history(session_id: str, tenant_id: str) -> list[dict]:
-    """Get message history for a session. Filtered by tenant_id for security."""
     try:
         sb = get_supabase()
 
-        # First verify session belongs to tenant
-        session_check = (
-            sb.table("conversation_sessions_v2")
-            .select("id")
-            .eq("session_id", session_id)
-            .eq("tenant_id", tenant_id)
-            .maybe_single()
-            .execute()
-        )
+        params = {"p_tenant_id": tenant_id, "p_session_id": session_id, "p_limit": limit}
+        if before:
+            params["p_before_created_at"], params["p_before_id"] = before[0], int(before[1])
 
-        if not session_check.data:
+        result = sb.rpc("get_dashboard_session_history", params).execute().data or {}
+        if not result.get("found"):
             print(f"Session {session_id} not found for tenant {tenant_id}")
-            return []
-
-        response = (
-            sb.table("recent_history_v2")
-            .select("role, message, created_at")
-            .eq("session_id", session_id)
-            .order("created_at")
-            .execute()
-        )
-
-        return response.data or []
+            return empty
+
+        # The RPC pages newest first; the viewer wants chronological order
+        messages = result.get("messages") or []
+        messages.reverse()
+        chat = {
+            "summary": result.get("summary"),
+            "client_name": result.get("client_name"),
+            "messages": messages,
+        }
+        if result.get("finished"):
+            transcripts.set(key, copy.deepcopy(chat))
+        return chat
     except Exception as e:
+        _report_rpc_error(e, "get_dashboard_session_history", "db/rpc_dashboard_metrics.sql")
         print(f"Error fetching history: {e}")
-        return []
+        return empty
+
+
+def get_transcript_cache_stats() -> dict:
+    """Hit/miss counters and memory use of the transcript cache."""
+    return get_transcript_cache().stats()
 
 
 # ============================================================
@@ -385,27 +803,69 @@ def get_wishlist_items(
     status_filter: str = "pending",
     limit: int = 20,
     offset: int = 0,
-) -> tuple[list[dict], int]:
-    """Get wishlist items with client info. Returns (data, total_count)."""
+    count_mode: str | None = "exact",
+) -> tuple[list[dict], int | None, bool]:
+    """Get wishlist items with client info.
+
+    Returns (data, total_count, approximate).
+
+    count_mode works as in get_sessions.
+    """
     try:
-        sb = get_supabase()
+        return load_wishlist_items(tenant_id, status_filter, limit, offset, count_mode)
+    except Exception as e:
+        print(f"Error fetching wishlist: {e}")
+        return [], 0, False
+
+
+def load_wishlist_items(
+    tenant_id: str,
+    status_filter: str = "pending",
+    limit: int = 20,
+    offset: int = 0,
+    count_mode: str | None = "exact",
+) -> tuple[list[dict], int | None, bool]:
+    """Like get_wishlist_items, but raises on errors (for PageLoader)."""
+    sb = get_supabase()
 
+    def filtered(columns: str, count: str | None = None):
         query = (
             sb.table("wishlist_v2")
-            .select("*, clients_v2(full_name, phone)", count="exact")
+            .select(columns, count=count)
             .eq("tenant_id", tenant_id)
-            .order("created_at", desc=True)
-            .range(offset, offset + limit - 1)
         )
-
         if status_filter and status_filter != "all":
             query = query.eq("status", status_filter)
-
-        response = query.execute()
-        return response.data or [], response.count or 0
+        return query
+
+    response = (
+        filtered("*, clients_v2(full_name, phone)", _count_method(count_mode))
+        .order("created_at", desc=True)
+        .range(offset, offset + limit - 1)
+        .execute()
+    )
+    total, approximate = _resolve_count(
+        response.count, count_mode, lambda: filtered("id", "exact").limit(1)
+    )
+    return response.data or [], total, approximate
+
+
+def get_wishlist_item(item_id: int, tenant_id: str) -> dict | None:
+    """Get one wishlist item with client info, as in get_wishlist_items."""
+    try:
+        sb = get_supabase()
+        response = (
+            sb.table("wishlist_v2")
+            .select("*, clients_v2(full_name, phone)")
+            .eq("id", item_id)
+            .eq("tenant_id", tenant_id)
+            .maybe_single()
+            .execute()
+        )
+        return response.data if response else None
     except Exception as e:
-        print(f"Error fetching wishlist: {e}")
-        return [], 0
+        print(f"Error fetching wishlist item: {e}")
+        return None
 
 
 def update_wishlist_status(
@@ -441,7 +901,10 @@ def update_wishlist_status(
             .execute()
         )
 
-        return len(response.data) > 0
+        updated = len(response.data) > 0
+        if updated:
+            invalidate_tenant(tenant_id, "wishlist_stats")
+        return updated
     except Exception as e:
         print(f"Error updating wishlist status: {e}")
         return False
@@ -460,7 +923,10 @@ def delete_wishlist_item(item_id: int, tenant_id: str) -> bool:
             .execute()
         )
 
-        return len(response.data) > 0
+        deleted = len(response.data) > 0
+        if deleted:
+            invalidate_tenant(tenant_id, "wishlist_stats")
+        return deleted
     except Exception as e:
         print(f"Error deleting wishlist item: {e}")
         return False
@@ -469,29 +935,40 @@ def delete_wishlist_item(item_id: int, tenant_id: str) -> bool:
 def get_wishlist_stats(tenant_id: str) -> dict:
     """Get wishlist KPI statistics."""
     try:
-        sb = get_supabase()
-        response = (
-            sb.table("wishlist_v2")
-            .select("status, amount")
-            .eq("tenant_id", tenant_id)
-            .execute()
-        )
-
-        stats = {"converted": 0, "cancelled": 0, "pending": 0, "total_revenue": 0.0}
-
-        for row in response.data:
-            status = row.get("status", "pending")
-            if status in stats:
-                stats[status] += 1
-            if status == "converted" and row.get("amount"):
-                stats["total_revenue"] += float(row["amount"])
-
-        return stats
+        return load_wishlist_stats(tenant_id)
     except Exception as e:
         print(f"Error fetching wishlist stats: {e}")
         return {"converted": 0, "cancelled": 0, "pending": 0, "total_revenue": 0.0}
 
 
+def load_wishlist_stats(tenant_id: str) -> dict:
+    """Like get_wishlist_stats, but raises on errors (for PageLoader)."""
+    return _fetch_wishlist_stats(tenant_id)
+
+
+@cached("wishlist_stats", ttl=30)
+def _fetch_wishlist_stats(tenant_id: str) -> dict:
+    """Aggregate wishlist statuses. Raises on errors so failures are never cached."""
+    sb = get_supabase()
+    response = (
+        sb.table("wishlist_v2")
+        .select("status, amount")
+        .eq("tenant_id", tenant_id)
+        .execute()
+    )
+
+    stats = {"converted": 0, "cancelled": 0, "pending": 0, "total_revenue": 0.0}
+
+    for row in response.data:
+        status = row.get("status", "pending")
+        if status in stats:
+            stats[status] += 1
+        if status == "converted" and row.get("amount"):
+            stats["total_revenue"] += float(row["amount"])
+
+    return stats
+
+
 # ============================================================
 # User Management Queries (Super Admin)
 # ============================================================
@@ -500,17 +977,7 @@ def get_wishlist_stats(tenant_id: str) -> dict:
 def get_all_users() -> list[dict]:
     """Get all users via direct RPC call."""
     try:
-        import httpx
-
-        url = f"{settings.supabase_url}/rest/v1/rpc/get_all_dashboard_users"
-        headers = {
-            "apikey": settings.supabase_service_key,
-            "Authorization": f"Bearer {settings.supabase_service_key}",
-        }
-
-        # Use sync client
-        with httpx.Client() as client:
-            response = client.post(url, headers=headers)
+        response = _call_rpc("get_all_dashboard_users")
 
         if response.status_code == 200:
             return response.json()
@@ -527,7 +994,6 @@ def create_user(user_data: dict) -> tuple[bool, str]:
     """Create new user via direct RPC call (bypassing SDK issues)."""
     try:
         from auth import hash_password
-        import httpx
 
         # Prepare data
         new_user = user_data.copy()
@@ -538,13 +1004,6 @@ def create_user(user_data: dict) -> tuple[bool, str]:
         encrypted_password = hash_password(raw_password)
 
         # Call RPC via raw HTTP to avoid Supabase SDK parsing errors (JSON 404/200 issue)
-        url = f"{settings.supabase_url}/rest/v1/rpc/create_dashboard_user"
-        headers = {
-            "apikey": settings.supabase_service_key,
-            "Authorization": f"Bearer {settings.supabase_service_key}",
-            "Content-Type": "application/json",
-        }
-
         params = {
             "p_email": new_user.get("email"),
             "p_encrypted_password": encrypted_password,
@@ -554,9 +1013,7 @@ def create_user(user_data: dict) -> tuple[bool, str]:
             "p_tenant_id": new_user.get("tenant_id"),
         }
 
-        # Use sync client since this function is sync
-        with httpx.Client() as client:
-            response = client.post(url, json=params, headers=headers)
+        response = _call_rpc("create_dashboard_user", params)
 
         if response.status_code != 200:
             return False, f"Server Error {response.status_code}: {response.text}"
@@ -576,16 +1033,7 @@ def create_user(user_data: dict) -> tuple[bool, str]:
 def delete_user(user_id: int) -> bool:
     """Delete user via direct RPC call."""
     try:
-        import httpx
-
-        url = f"{settings.supabase_url}/rest/v1/rpc/delete_dashboard_user"
-        headers = {
-            "apikey": settings.supabase_service_key,
-            "Authorization": f"Bearer {settings.supabase_service_key}",
-            "Content-Type": "application/json",
-        }
-        with httpx.Client() as client:
-            response = client.post(url, json={"p_user_id": user_id}, headers=headers)
+        response = _call_rpc("delete_dashboard_user", {"p_user_id": user_id})
 
         return response.status_code == 200 and response.json() is True
     except Exception as e:
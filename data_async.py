@@ -0,0 +1,307 @@
+"""Async Data Access Layer.
+
+Async counterparts of the functions in data.py. The Supabase SDK client is
+synchronous, so every call is dispatched to a bounded, process-wide thread
+pool. Page handlers await these functions instead of calling data.py
+directly, which keeps the NiceGUI event loop free while PostgREST answers.
+
+Aggregate queries go through run_db_shared: identical calls made while one
+is running await that call instead of taking another pool thread.
+"""
+
+import asyncio
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import data
+from config import settings
+
+# Singleton executor for blocking Supabase calls
+_executor: ThreadPoolExecutor | None = None
+
+# Running run_db_shared calls by (function, arguments)
+_in_flight: dict[tuple, asyncio.Task] = {}
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the data executor (singleton pattern)."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.db_max_workers, thread_name_prefix="data"
+        )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Stop the data executor. Registered on app shutdown in main.py."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_db(func, *args, **kwargs):
+    """Run a blocking data function in the executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
+
+
+async def run_db_shared(func, *args, **kwargs):
+    """Like run_db, but identical concurrent calls share one execution.
+
+    The first call starts a task; calls with the same function and
+    arguments arriving while it runs await that task, so a burst of page
+    loads for one tenant costs one query and one pool thread. Every caller
+    gets its own copy of the result, or the same exception.
+    """
+    key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(run_db(func, *args, **kwargs))
+        _in_flight[key] = task
+
+        def forget(done: asyncio.Task) -> None:
+            if _in_flight.get(key) is done:
+                del _in_flight[key]
+
+        task.add_done_callback(forget)
+
+    # Shielded: a caller that gives up (page timeout) must not cancel the others
+    return copy.deepcopy(await asyncio.shield(task))
+
+
+# ============================================================
+# Auth Queries
+# ============================================================
+
+
+async def get_user_by_email(email: str) -> dict | None:
+    """Async version of data.get_user_by_email."""
+    return await run_db(data.get_user_by_email, email)
+
+
+async def get_tenants(refresh: bool = False) -> list[dict]:
+    """Async version of data.get_tenants."""
+    return await run_db(data.get_tenants, refresh=refresh)
+
+
+async def refresh_tenants() -> list[dict]:
+    """Async version of data.refresh_tenants."""
+    return await run_db(data.refresh_tenants)
+
+
+async def get_tenant_settings(tenant_id: str) -> dict | None:
+    """Async version of data.get_tenant_settings."""
+    return await run_db(data.get_tenant_settings, tenant_id)
+
+
+async def update_tenant_metadata(
+    tenant_id: str,
+    metadata: dict,
+    user_role: str = "",
+    user_tenant_id: str | None = None,
+) -> bool:
+    """Async version of data.update_tenant_metadata."""
+    return await run_db(
+        data.update_tenant_metadata,
+        tenant_id,
+        metadata,
+        user_role=user_role,
+        user_tenant_id=user_tenant_id,
+    )
+
+
+# ============================================================
+# Overview Queries
+# ============================================================
+
+
+async def get_kpi_summary(
+    tenant_id: str, date_from: str | None = None, date_to: str | None = None
+) -> dict:
+    """Async version of data.get_kpi_summary."""
+    return await run_db_shared(
+        data.get_kpi_summary, tenant_id, date_from=date_from, date_to=date_to
+    )
+
+
+async def load_kpi_summary(
+    tenant_id: str, date_from: str | None = None, date_to: str | None = None
+) -> dict:
+    """Async version of data.load_kpi_summary."""
+    return await run_db_shared(
+        data.load_kpi_summary, tenant_id, date_from=date_from, date_to=date_to
+    )
+
+
+async def get_funnel_data(
+    tenant_id: str, date_from: str | None = None, date_to: str | None = None
+) -> dict:
+    """Async version of data.get_funnel_data."""
+    return await run_db_shared(
+        data.get_funnel_data, tenant_id, date_from=date_from, date_to=date_to
+    )
+
+
+async def load_funnel_data(
+    tenant_id: str, date_from: str | None = None, date_to: str | None = None
+) -> dict:
+    """Async version of data.load_funnel_data."""
+    return await run_db_shared(
+        data.load_funnel_data, tenant_id, date_from=date_from, date_to=date_to
+    )
+
+
+async def get_metrics_trend(
+    tenant_id: str, date_from: str | None = None, date_to: str | None = None
+) -> dict:
+    """Async version of data.get_metrics_trend."""
+    return await run_db_shared(
+        data.get_metrics_trend, tenant_id, date_from=date_from, date_to=date_to
+    )
+
+
+async def load_metrics_trend(
+    tenant_id: str, date_from: str | None = None, date_to: str | None = None
+) -> dict:
+    """Async version of data.load_metrics_trend."""
+    return await run_db_shared(
+        data.load_metrics_trend, tenant_id, date_from=date_from, date_to=date_to
+    )
+
+
+# ============================================================
+# Sessions Queries
+# ============================================================
+
+
+async def get_sessions(
+    tenant_id: str,
+    limit: int = 20,
+    offset: int = 0,
+    status_filter: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    after: tuple[str, int] | None = None,
+    before: tuple[str, int] | None = None,
+    count_mode: str | None = "exact",
+    descending: bool = True,
+) -> tuple[list[dict], int | None, bool]:
+    """Async version of data.get_sessions."""
+    return await run_db(
+        data.get_sessions,
+        tenant_id,
+        limit=limit,
+        offset=offset,
+        status_filter=status_filter,
+        date_from=date_from,
+        date_to=date_to,
+        after=after,
+        before=before,
+        count_mode=count_mode,
+        descending=descending,
+    )
+
+
+async def get_session_history(
+    session_id: str,
+    tenant_id: str,
+    limit: int | None = None,
+    before: tuple[str, int] | None = None,
+) -> dict:
+    """Async version of data.get_session_history."""
+    return await run_db(
+        data.get_session_history, session_id, tenant_id, limit=limit, before=before
+    )
+
+
+# ============================================================
+# Wishlist Queries
+# ============================================================
+
+
+async def get_wishlist_items(
+    tenant_id: str,
+    status_filter: str = "pending",
+    limit: int = 20,
+    offset: int = 0,
+    count_mode: str | None = "exact",
+) -> tuple[list[dict], int | None, bool]:
+    """Async version of data.get_wishlist_items."""
+    return await run_db(
+        data.get_wishlist_items,
+        tenant_id,
+        status_filter=status_filter,
+        limit=limit,
+        offset=offset,
+        count_mode=count_mode,
+    )
+
+
+async def load_wishlist_items(
+    tenant_id: str,
+    status_filter: str = "pending",
+    limit: int = 20,
+    offset: int = 0,
+    count_mode: str | None = "exact",
+) -> tuple[list[dict], int | None, bool]:
+    """Async version of data.load_wishlist_items."""
+    return await run_db(
+        data.load_wishlist_items,
+        tenant_id,
+        status_filter=status_filter,
+        limit=limit,
+        offset=offset,
+        count_mode=count_mode,
+    )
+
+
+async def get_wishlist_item(item_id: int, tenant_id: str) -> dict | None:
+    """Async version of data.get_wishlist_item."""
+    return await run_db(data.get_wishlist_item, item_id, tenant_id)
+
+
+async def update_wishlist_status(
+    item_id: int, status: str, tenant_id: str, amount: float | None = None
+) -> bool:
+    """Async version of data.update_wishlist_status."""
+    return await run_db(
+        data.update_wishlist_status, item_id, status, tenant_id, amount=amount
+    )
+
+
+async def delete_wishlist_item(item_id: int, tenant_id: str) -> bool:
+    """Async version of data.delete_wishlist_item."""
+    return await run_db(data.delete_wishlist_item, item_id, tenant_id)
+
+
+async def get_wishlist_stats(tenant_id: str) -> dict:
+    """Async version of data.get_wishlist_stats."""
+    return await run_db_shared(data.get_wishlist_stats, tenant_id)
+
+
+async def load_wishlist_stats(tenant_id: str) -> dict:
+    """Async version of data.load_wishlist_stats."""
+    return await run_db_shared(data.load_wishlist_stats, tenant_id)
+
+
+# ============================================================
+# User Management Queries (Super Admin)
+# ============================================================
+
+
+async def get_all_users() -> list[dict]:
+    """Async version of data.get_all_users."""
+    return await run_db(data.get_all_users)
+
+
+async def create_user(user_data: dict) -> tuple[bool, str]:
+    """Async version of data.create_user."""
+    return await run_db(data.create_user, user_data)
+
+
+async def delete_user(user_id: int) -> bool:
+    """Async version of data.delete_user."""
+    return await run_db(data.delete_user, user_id)
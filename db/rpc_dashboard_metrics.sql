@@ -0,0 +1,475 @@
+-- Dashboard aggregate RPCs.
+-- Run in Supabase SQL Editor after db/rpc_user_management.sql.
+
+-- 0. Indexes
+-- Every aggregate below filters by tenant and started_at range.
+-- The trailing id also serves keyset pagination of the sessions list
+-- (ORDER BY started_at DESC, id DESC), see data.get_sessions.
+CREATE INDEX IF NOT EXISTS idx_sessions_tenant_started
+    ON public.conversation_sessions_v2 (tenant_id, started_at, id);
+
+-- 1. KPI Summary (sessions, bookings, conversion, revenue in one round trip)
+-- Also returns the bot response latency of the range (see section 5).
+CREATE OR REPLACE FUNCTION public.get_dashboard_kpi_summary(
+    p_tenant_id uuid,
+    p_date_from date,
+    p_date_to date
+)
+RETURNS json
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_responses bigint;
+    v_avg_response_ms integer;
+BEGIN
+    SELECT
+        coalesce(sum(l.response_count), 0),
+        coalesce(round(
+            sum(l.avg_response_ms * l.response_count) / nullif(sum(l.response_count), 0)
+        ), 0)
+    INTO v_responses, v_avg_response_ms
+    FROM get_dashboard_response_latency(p_date_from, p_date_to, p_tenant_id) l;
+
+    RETURN (
+        SELECT json_build_object(
+            'sessions', count(*),
+            'bookings', count(*) FILTER (WHERE s.booking_id IS NOT NULL),
+            'conversion', CASE
+                WHEN count(*) = 0 THEN 0
+                ELSE round(
+                    count(*) FILTER (WHERE s.booking_id IS NOT NULL) * 100.0 / count(*), 1
+                )
+            END,
+            'revenue', coalesce(
+                sum(s.booking_amount) FILTER (WHERE s.booking_id IS NOT NULL), 0
+            ),
+            'responses', v_responses,
+            'avg_response_ms', v_avg_response_ms
+        )
+        FROM conversation_sessions_v2 s
+        WHERE s.tenant_id = p_tenant_id
+        AND s.started_at >= p_date_from
+        AND s.started_at < p_date_to + 1
+    );
+END;
+$$;
+
+-- 2. Conversion Funnel (stage counters bucketed on meta.drop_off_stage)
+-- A booked session passed every stage; otherwise drop_off_stage tells
+-- how far the client got. Mirrors components/funnel_chart.py keys.
+CREATE OR REPLACE FUNCTION public.get_dashboard_funnel(
+    p_tenant_id uuid,
+    p_date_from date,
+    p_date_to date
+)
+RETURNS json
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    RETURN (
+        SELECT json_build_object(
+            'started', count(*),
+            'service_selected', count(*) FILTER (
+                WHERE s.booking_id IS NOT NULL
+                OR s.meta->>'drop_off_stage' IN ('time_selection', 'staff_selection')
+            ),
+            'staff_selected', count(*) FILTER (
+                WHERE s.booking_id IS NOT NULL
+                OR s.meta->>'drop_off_stage' = 'time_selection'
+            ),
+            'time_selected', count(*) FILTER (WHERE s.booking_id IS NOT NULL),
+            'done', count(*) FILTER (WHERE s.booking_id IS NOT NULL)
+        )
+        FROM conversation_sessions_v2 s
+        WHERE s.tenant_id = p_tenant_id
+        AND s.started_at >= p_date_from
+        AND s.started_at < p_date_to + 1
+    );
+END;
+$$;
+
+-- 3. Daily Metrics for all tenants (used by save_dashboard_daily_metrics, section 10)
+-- One row per tenant per day, including days without sessions, so the
+-- whole range is written with a single upsert. p_tenant_id narrows it
+-- to one tenant.
+-- Revenue is rolled up too, so the overview can read closed days from
+-- metrics_dailies (see data.get_kpi_summary).
+ALTER TABLE dashboard.metrics_dailies
+    ADD COLUMN IF NOT EXISTS revenue numeric NOT NULL DEFAULT 0;
+
+DROP FUNCTION IF EXISTS public.get_dashboard_daily_metrics(date, date);
+CREATE OR REPLACE FUNCTION public.get_dashboard_daily_metrics(
+    p_date_from date,
+    p_date_to date,
+    p_tenant_id uuid DEFAULT NULL
+)
+RETURNS TABLE (
+    tenant_id uuid,
+    day date,
+    dialogs_started bigint,
+    bookings bigint,
+    conversion numeric,
+    revenue numeric
+)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        t.id,
+        d.day::date,
+        count(s.id),
+        count(s.id) FILTER (WHERE s.booking_id IS NOT NULL),
+        CASE
+            WHEN count(s.id) = 0 THEN 0::numeric
+            ELSE round(
+                count(s.id) FILTER (WHERE s.booking_id IS NOT NULL) * 100.0 / count(s.id), 1
+            )
+        END,
+        coalesce(sum(s.booking_amount) FILTER (WHERE s.booking_id IS NOT NULL), 0)
+    FROM tenants_v2 t
+    CROSS JOIN generate_series(p_date_from, p_date_to, interval '1 day') AS d(day)
+    LEFT JOIN conversation_sessions_v2 s
+        ON s.tenant_id = t.id
+        AND s.started_at >= d.day
+        AND s.started_at < d.day + interval '1 day'
+    WHERE p_tenant_id IS NULL OR t.id = p_tenant_id
+    GROUP BY t.id, d.day
+    ORDER BY d.day, t.id;
+END;
+$$;
+
+-- 4. Collector watermark (used by jobs/metrics_collector.py --mode incremental)
+-- Archived sessions land in conversation_sessions_v2 with created_at set
+-- when the session closes, so created_at tells which days need recomputing.
+CREATE INDEX IF NOT EXISTS idx_sessions_created
+    ON public.conversation_sessions_v2 (created_at);
+
+CREATE TABLE IF NOT EXISTS dashboard.collector_state (
+    job text PRIMARY KEY,
+    watermark timestamptz,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION public.get_dashboard_changed_days(p_since timestamptz)
+RETURNS json
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    RETURN (
+        SELECT json_build_object(
+            'days', coalesce(
+                json_agg(DISTINCT s.started_at::date ORDER BY s.started_at::date),
+                '[]'::json
+            ),
+            'watermark', max(s.created_at)
+        )
+        FROM conversation_sessions_v2 s
+        WHERE s.created_at > p_since
+    );
+END;
+$$;
+
+-- 5. Bot response latency (user message -> next assistant message)
+-- Pairs each assistant message with the message right before it in the
+-- same session; a pair counts when that message came from the user. The
+-- window runs inside Postgres, so only a few numbers per tenant-day leave
+-- the database. Days are attributed by the user message time; replies
+-- are read up to an hour past the range, so a question asked just before
+-- midnight still gets its answer.
+ALTER TABLE dashboard.metrics_dailies
+    ADD COLUMN IF NOT EXISTS response_count integer NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS p50_response_ms integer NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS p95_response_ms integer NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_history_tenant_created
+    ON public.recent_history_v2 (tenant_id, created_at);
+
+CREATE OR REPLACE FUNCTION public.get_dashboard_response_latency(
+    p_date_from date,
+    p_date_to date,
+    p_tenant_id uuid DEFAULT NULL
+)
+RETURNS TABLE (
+    tenant_id uuid,
+    day date,
+    response_count bigint,
+    avg_response_ms integer,
+    p50_response_ms integer,
+    p95_response_ms integer
+)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH ordered AS (
+        SELECT
+            h.tenant_id AS tid,
+            h.role AS msg_role,
+            h.created_at AS msg_at,
+            lag(h.role) OVER w AS prev_role,
+            lag(h.created_at) OVER w AS prev_at
+        FROM recent_history_v2 h
+        WHERE h.session_id IS NOT NULL
+        AND (p_tenant_id IS NULL OR h.tenant_id = p_tenant_id)
+        AND h.created_at >= p_date_from
+        -- Run past the range so late replies to its last questions are paired
+        AND h.created_at < p_date_to + 1 + interval '1 hour'
+        WINDOW w AS (PARTITION BY h.session_id ORDER BY h.created_at, h.id)
+    ),
+    replies AS (
+        SELECT
+            o.tid,
+            o.prev_at::date AS reply_day,
+            extract(epoch FROM o.msg_at - o.prev_at) * 1000 AS latency_ms
+        FROM ordered o
+        WHERE o.msg_role = 'assistant'
+        AND o.prev_role = 'user'
+        AND o.prev_at < p_date_to + 1
+    )
+    SELECT
+        r.tid,
+        r.reply_day,
+        count(*),
+        round(avg(r.latency_ms))::integer,
+        round(percentile_cont(0.5) WITHIN GROUP (ORDER BY r.latency_ms))::integer,
+        round(percentile_cont(0.95) WITHIN GROUP (ORDER BY r.latency_ms))::integer
+    FROM replies r
+    GROUP BY r.tid, r.reply_day
+    ORDER BY r.reply_day, r.tid;
+END;
+$$;
+
+-- 6. Metrics trend (overview chart, see data.get_metrics_trend)
+-- Reads the metrics_dailies rollups and groups them into day, week or
+-- month buckets, so a year-long range returns ~52 points, not 365.
+-- Empty buckets are returned as zeros to keep the time axis continuous.
+-- Only closed days are read: today is still open and is added live by
+-- data.get_metrics_trend, so a partial rollup row must not count twice.
+CREATE OR REPLACE FUNCTION public.get_dashboard_metrics_trend(
+    p_tenant_id uuid,
+    p_date_from date,
+    p_date_to date,
+    p_bucket text DEFAULT 'day'
+)
+RETURNS TABLE (
+    period date,
+    sessions bigint,
+    bookings bigint,
+    conversion numeric
+)
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF p_bucket NOT IN ('day', 'week', 'month') THEN
+        RAISE EXCEPTION 'Unsupported bucket: %', p_bucket;
+    END IF;
+
+    RETURN QUERY
+    WITH buckets AS (
+        SELECT b.period::date AS period
+        FROM generate_series(
+            date_trunc(p_bucket, p_date_from::timestamp),
+            date_trunc(p_bucket, p_date_to::timestamp),
+            ('1 ' || p_bucket)::interval
+        ) AS b(period)
+    ),
+    rollups AS (
+        SELECT
+            date_trunc(p_bucket, m.day::timestamp)::date AS period,
+            sum(m.dialogs_started) AS sessions,
+            sum(m.bookings) AS bookings
+        FROM dashboard.metrics_dailies m
+        WHERE m.tenant_id = p_tenant_id
+        AND m.day BETWEEN p_date_from AND p_date_to
+        AND m.day < current_date
+        GROUP BY 1
+    )
+    SELECT
+        b.period,
+        coalesce(r.sessions, 0)::bigint,
+        coalesce(r.bookings, 0)::bigint,
+        CASE
+            WHEN coalesce(r.sessions, 0) = 0 THEN 0::numeric
+            ELSE round(r.bookings * 100.0 / r.sessions, 1)
+        END
+    FROM buckets b
+    LEFT JOIN rollups r ON r.period = b.period
+    ORDER BY b.period;
+END;
+$$;
+
+-- 7. Chat history paging (see data.get_session_history)
+-- The chat viewer loads the newest messages first and pages back by
+-- (created_at, id), so each page is one index range scan.
+CREATE INDEX IF NOT EXISTS idx_history_session_created_id
+    ON public.recent_history_v2 (session_id, created_at, id);
+
+-- 8. Chat viewer payload (see data.get_session_history)
+-- Checks that the session belongs to the tenant and returns its summary,
+-- client name and one page of messages (newest first) in a single round
+-- trip. found = false when the session is not the tenant's. finished tells
+-- the dashboard the transcript can no longer change and may be cached.
+CREATE OR REPLACE FUNCTION public.get_dashboard_session_history(
+    p_tenant_id uuid,
+    p_session_id uuid,
+    p_limit integer DEFAULT NULL,
+    p_before_created_at timestamptz DEFAULT NULL,
+    p_before_id bigint DEFAULT NULL
+)
+RETURNS json
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_summary text;
+    v_client_name text;
+    v_finished boolean;
+BEGIN
+    SELECT
+        s.summary,
+        c.full_name,
+        s.ended_at IS NOT NULL OR s.final_status IN (
+            'done', 'completed', 'booked', 'abandoned', 'auto_closed',
+            'transferred', 'ghost', 'no_slots', 'price_too_high'
+        )
+    INTO v_summary, v_client_name, v_finished
+    FROM conversation_sessions_v2 s
+    LEFT JOIN clients_v2 c ON c.id = s.user_id
+    WHERE s.session_id = p_session_id
+    AND s.tenant_id = p_tenant_id
+    LIMIT 1;
+
+    IF NOT FOUND THEN
+        RETURN json_build_object('found', false, 'messages', '[]'::json);
+    END IF;
+
+    RETURN json_build_object(
+        'found', true,
+        'finished', v_finished,
+        'summary', v_summary,
+        'client_name', v_client_name,
+        'messages', coalesce((
+            SELECT json_agg(m ORDER BY m.created_at DESC, m.id DESC)
+            FROM (
+                SELECT h.id, h.role, h.message, h.created_at
+                FROM recent_history_v2 h
+                WHERE h.session_id = p_session_id
+                AND (
+                    p_before_created_at IS NULL
+                    OR (h.created_at, h.id) < (p_before_created_at, p_before_id)
+                )
+                ORDER BY h.created_at DESC, h.id DESC
+                LIMIT p_limit
+            ) m
+        ), '[]'::json)
+    );
+END;
+$$;
+
+-- 9. Wishlist change feed (see live.RealtimeChangeSource)
+-- Open wishlist pages follow wishlist_v2 through Supabase Realtime.
+-- REPLICA IDENTITY FULL puts the old row into update/delete events, so
+-- pages can move KPI counters from the old status to the new one.
+ALTER TABLE public.wishlist_v2 REPLICA IDENTITY FULL;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_publication_tables
+        WHERE pubname = 'supabase_realtime'
+        AND schemaname = 'public'
+        AND tablename = 'wishlist_v2'
+    ) THEN
+        ALTER PUBLICATION supabase_realtime ADD TABLE public.wishlist_v2;
+    END IF;
+END;
+$$;
+
+-- 10. Daily rollup writer (used by jobs/metrics_collector.py)
+-- Computes the daily metrics and response latency of a range and upserts
+-- them into metrics_dailies inside Postgres. Nothing passes through
+-- PostgREST, whose max_rows limit would silently cut long ranges short.
+-- Returns the number of rows written.
+CREATE OR REPLACE FUNCTION public.save_dashboard_daily_metrics(
+    p_date_from date,
+    p_date_to date,
+    p_tenant_id uuid DEFAULT NULL
+)
+RETURNS integer
+LANGUAGE plpgsql
+VOLATILE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_rows integer;
+BEGIN
+    INSERT INTO dashboard.metrics_dailies (
+        tenant_id,
+        day,
+        dialogs_started,
+        bookings,
+        conversion,
+        revenue,
+        response_count,
+        avg_response_ms,
+        p50_response_ms,
+        p95_response_ms,
+        updated_at
+    )
+    SELECT
+        d.tenant_id,
+        d.day,
+        d.dialogs_started,
+        d.bookings,
+        d.conversion,
+        d.revenue,
+        coalesce(l.response_count, 0),
+        coalesce(l.avg_response_ms, 0),
+        coalesce(l.p50_response_ms, 0),
+        coalesce(l.p95_response_ms, 0),
+        now()
+    FROM get_dashboard_daily_metrics(p_date_from, p_date_to, p_tenant_id) d
+    LEFT JOIN get_dashboard_response_latency(p_date_from, p_date_to, p_tenant_id) l
+        ON l.tenant_id = d.tenant_id
+        AND l.day = d.day
+    ON CONFLICT (tenant_id, day) DO UPDATE SET
+        dialogs_started = EXCLUDED.dialogs_started,
+        bookings = EXCLUDED.bookings,
+        conversion = EXCLUDED.conversion,
+        revenue = EXCLUDED.revenue,
+        response_count = EXCLUDED.response_count,
+        avg_response_ms = EXCLUDED.avg_response_ms,
+        p50_response_ms = EXCLUDED.p50_response_ms,
+        p95_response_ms = EXCLUDED.p95_response_ms,
+        updated_at = EXCLUDED.updated_at;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$;
+
+-- Writes rollups, so only the service role (the collector) may call it
+REVOKE EXECUTE ON FUNCTION public.save_dashboard_daily_metrics(date, date, uuid)
+    FROM PUBLIC, anon, authenticated;
@@ -3,84 +3,342 @@ Daily Metrics Collector Job.
 
 This script should be scheduled to run daily (e.g., at 01:00 UTC) via cron or Prefect.
 It calculates KPIs for the previous day for all tenants and stores them in `metrics_dailies`.
+
+Modes (--mode):
+- tenant (default): tenants are processed concurrently (COLLECTOR_WORKERS at a
+  time), each with a timeout (COLLECTOR_TIMEOUT) and retries (COLLECTOR_RETRIES),
+  so the run takes about as long as the slowest tenant.
+- bulk: every tenant's row is computed and upserted inside Postgres by one
+  call of the save_dashboard_daily_metrics RPC, so the number of queries does
+  not grow with the number of tenants and no rows pass through PostgREST.
+- incremental: recomputes only the days whose sessions were archived after
+  the watermark stored in dashboard.collector_state, then advances it.
+  Late sessions (bookings finalized after midnight) update their old day.
+
+Every row also carries the bot response latency of the day (avg/p50/p95 of
+user → assistant reply time), computed in Postgres by the
+get_dashboard_response_latency RPC for the whole range at once.
+
+Backfill: --from/--to recompute a date range (e.g. after downtime).
+Ranges are processed in bulk, --chunk-days days per query and upsert.
+
+Examples:
+    python jobs/metrics_collector.py --mode incremental
+    python jobs/metrics_collector.py --from 2025-12-01 --to 2025-12-31
 """
 
+import argparse
 import asyncio
-from datetime import date, timedelta, datetime
+from datetime import date, timedelta, datetime, timezone
 import sys
 import os
 
 # Add parent dir to path to import config/data
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from data import get_supabase, get_kpi_summary
+from config import settings
+from data import get_supabase, get_dashboard_db
+from data_async import run_db, shutdown_executor
+
+# Key of this job in dashboard.collector_state
+WATERMARK_JOB = "metrics_dailies"
+
+# Re-scan this far behind the watermark to catch rows committed out of order
+WATERMARK_OVERLAP = timedelta(minutes=10)
+
+
+def save_metrics_for_tenant(tenant_id: str, target_date: date) -> int:
+    """Compute and upsert one tenant's daily row. Raises on any failure.
+
+    Uses the same RPC as the bulk mode narrowed to one tenant, so the
+    latency window runs once. Errors must propagate: a failed query must
+    not be saved as a day with zero sessions.
+    """
+    # Note: the RPC expects string dates YYYY-MM-DD
+    date_str = target_date.isoformat()
+
+    sb = get_supabase()
+    response = sb.rpc(
+        "save_dashboard_daily_metrics",
+        {"p_date_from": date_str, "p_date_to": date_str, "p_tenant_id": tenant_id},
+    ).execute()
+    return int(response.data or 0)
+
+
+def save_metrics_bulk(date_from: date, date_to: date) -> int:
+    """Compute and upsert all tenants' rows for a range inside Postgres.
+
+    The rows never leave the database, so PostgREST's max_rows cannot
+    truncate them. Returns the number of rows written. Raises on any failure.
+    """
+    sb = get_supabase()
+
+    response = sb.rpc(
+        "save_dashboard_daily_metrics",
+        {"p_date_from": date_from.isoformat(), "p_date_to": date_to.isoformat()},
+    ).execute()
+    return int(response.data or 0)
+
+
+async def run_with_retries(label: str, func, *args):
+    """Run a blocking job step with a timeout and retries.
+
+    Returns the step's result, or None if every attempt failed. A timed out
+    attempt keeps running in its worker thread; the upserts are idempotent,
+    so a late finish of an abandoned attempt is harmless.
+    """
+    retries = max(1, settings.collector_retries)
+
+    for attempt in range(1, retries + 1):
+        try:
+            return await asyncio.wait_for(
+                run_db(func, *args), timeout=settings.collector_timeout
+            )
+
+        except asyncio.TimeoutError:
+            print(f"⏱️ Timeout for {label} (attempt {attempt}/{retries})")
+        except Exception as e:
+            print(f"❌ Error processing {label} (attempt {attempt}/{retries}): {e}")
+
+        if attempt < retries:
+            # Exponential backoff: 1s, 2s, 4s...
+            await asyncio.sleep(2 ** (attempt - 1))
+
+    return None
+
 
 async def collect_metrics_for_tenant(tenant_id: str, target_date: date):
-    """Calculate and save metrics for a single tenant."""
-    try:
-        # Get KPI summary for the specific date
-        # Note: get_kpi_summary expects string dates YYYY-MM-DD
-        date_str = target_date.isoformat()
-        
-        # Reuse existing logic from data.py
-        kpi = get_kpi_summary(tenant_id, date_from=date_str, date_to=date_str)
-        
-        sb = get_supabase()
-        
-        # Prepare data for insertion
-        metric_data = {
-            "day": date_str,
-            "tenant_id": tenant_id,
-            "dialogs_started": kpi["sessions"],
-            "bookings": kpi["bookings"],
-            "conversion": kpi["conversion"],
-            "avg_response_ms": 0,
-            "updated_at": datetime.utcnow().isoformat()
-        }
-        
-        # Upsert into metrics_dailies
-        # Assuming there is a unique constraint on (tenant_id, day)
-        result = sb.schema("dashboard").table("metrics_dailies") \
-            .upsert(metric_data, on_conflict="tenant_id, day") \
-            .execute()
-        
-        print(f"✅ Saved metrics for tenant {tenant_id}: {metric_data}")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Error processing tenant {tenant_id}: {e}")
+    """Calculate and save metrics for a single tenant, with timeout and retries."""
+    saved = await run_with_retries(
+        f"tenant {tenant_id}", save_metrics_for_tenant, tenant_id, target_date
+    )
+    if saved is None:
         return False
 
-async def main():
-    """Main execution flow."""
+    print(f"✅ Saved metrics for tenant {tenant_id} on {target_date}")
+    return True
+
+
+async def collect_metrics_bulk(target_date: date):
+    """Calculate and save metrics for all tenants with constant query count."""
+    saved = await run_with_retries(
+        f"bulk {target_date}", save_metrics_bulk, target_date, target_date
+    )
+    if saved is None:
+        return False
+
+    print(f"✅ Saved {saved} tenant rows for {target_date} in one query")
+    return True
+
+def get_watermark() -> datetime | None:
+    """Read the incremental watermark from dashboard.collector_state."""
+    db = get_dashboard_db()
+    response = db.table("collector_state") \
+        .select("watermark") \
+        .eq("job", WATERMARK_JOB) \
+        .execute()
+
+    if not response.data or not response.data[0].get("watermark"):
+        return None
+    return datetime.fromisoformat(response.data[0]["watermark"].replace("Z", "+00:00"))
+
+
+def set_watermark(watermark: str) -> None:
+    """Store the incremental watermark in dashboard.collector_state."""
+    db = get_dashboard_db()
+    db.table("collector_state") \
+        .upsert(
+            {
+                "job": WATERMARK_JOB,
+                "watermark": watermark,
+                "updated_at": datetime.utcnow().isoformat(),
+            },
+            on_conflict="job",
+        ) \
+        .execute()
+
+
+def get_changed_days(since: datetime) -> tuple[list[date], str | None]:
+    """Days with sessions archived after `since`, and the newest created_at seen."""
+    sb = get_supabase()
+    result = sb.rpc(
+        "get_dashboard_changed_days", {"p_since": since.isoformat()}
+    ).execute().data or {}
+
+    days = [date.fromisoformat(d) for d in result.get("days") or []]
+    return days, result.get("watermark")
+
+
+def group_days(days: list[date], chunk_days: int) -> list[tuple[date, date]]:
+    """Merge days into consecutive ranges of at most chunk_days days."""
+    ranges: list[tuple[date, date]] = []
+    for day in sorted(set(days)):
+        if ranges:
+            start, end = ranges[-1]
+            if day == end + timedelta(days=1) and (day - start).days < chunk_days:
+                ranges[-1] = (start, day)
+                continue
+        ranges.append((day, day))
+    return ranges
+
+
+async def collect_days(days: list[date], chunk_days: int) -> bool:
+    """Recompute the given days in bulk, one chunk per query and upsert."""
+    all_saved = True
+    for start, end in group_days(days, max(1, chunk_days)):
+        saved = await run_with_retries(
+            f"days {start}..{end}", save_metrics_bulk, start, end
+        )
+        if saved is None:
+            all_saved = False
+            continue
+        print(f"✅ Saved {saved} rows for {start}..{end}")
+    return all_saved
+
+
+async def backfill(date_from: date, date_to: date, chunk_days: int) -> bool:
+    """Recompute every day of [date_from, date_to]."""
+    print(f"🚀 Backfilling metrics for {date_from}..{date_to}")
+    days = [date_from + timedelta(days=n) for n in range((date_to - date_from).days + 1)]
+    return await collect_days(days, chunk_days)
+
+
+async def incremental(chunk_days: int) -> bool:
+    """Recompute only days whose sessions changed since the last watermark.
+
+    Without a stored watermark the run starts from yesterday. The watermark
+    only advances when every changed day was saved, so failures are retried
+    by the next run. Today is still open and is skipped; the watermark then
+    stops at today's midnight, so the next run picks today up once closed.
+    """
+    watermark = await run_db(get_watermark)
+    if watermark:
+        since = watermark - WATERMARK_OVERLAP
+    else:
+        yesterday = date.today() - timedelta(days=1)
+        since = datetime(yesterday.year, yesterday.month, yesterday.day, tzinfo=timezone.utc)
+
+    print(f"🚀 Incremental run: sessions archived since {since.isoformat()}")
+
+    days, new_watermark = await run_db(get_changed_days, since)
+
+    # A rollup of an open day would be partial, yet read as final
+    today = date.today()
+    if any(day >= today for day in days):
+        days = [day for day in days if day < today]
+        midnight = datetime(today.year, today.month, today.day, tzinfo=timezone.utc)
+        if new_watermark and datetime.fromisoformat(new_watermark.replace("Z", "+00:00")) > midnight:
+            new_watermark = midnight.isoformat()
+
+    if not days:
+        print("No closed day changed since the last run.")
+        if new_watermark:
+            await run_db(set_watermark, new_watermark)
+        return True
+
+    print(f"found {len(days)} changed days: {days[0]}..{days[-1]}")
+    all_saved = await collect_days(days, chunk_days)
+
+    if all_saved and new_watermark:
+        await run_db(set_watermark, new_watermark)
+    return all_saved
+
+
+async def main(mode: str = "tenant") -> bool:
+    """Main execution flow. Returns True when every row was saved."""
     print(f"🚀 Starting Metrics Collector for date: {date.today() - timedelta(days=1)}")
-    
+
+    if mode == "bulk":
+        ok = await collect_metrics_bulk(date.today() - timedelta(days=1))
+        print(f"\n🏁 Finished. Bulk run {'succeeded' if ok else 'failed'}")
+        return ok
+
     sb = get_supabase()
-    
+
     # 1. Get all tenants
     try:
         # We need all tenants using service role
-        response = sb.table("tenants_v2").select("id").execute()
+        response = await run_db(sb.table("tenants_v2").select("id").execute)
         tenants = response.data
         if not tenants:
             print("⚠️ No tenants found.")
-            return
-            
+            return True
+
         print(f"found {len(tenants)} tenants to process.")
-        
+
     except Exception as e:
         print(f"❌ Failed to fetch tenants: {e}")
-        return
+        return False
 
-    # 2. Process each tenant
+    # 2. Process tenants concurrently, at most COLLECTOR_WORKERS at a time
     target_date = date.today() - timedelta(days=1)
-    
-    success_count = 0
-    for tenant in tenants:
-        if await collect_metrics_for_tenant(tenant["id"], target_date):
-            success_count += 1
-            
+    semaphore = asyncio.Semaphore(max(1, settings.collector_workers))
+
+    async def process(tenant_id: str) -> bool:
+        async with semaphore:
+            return await collect_metrics_for_tenant(tenant_id, target_date)
+
+    results = await asyncio.gather(*(process(tenant["id"]) for tenant in tenants))
+    success_count = sum(results)
+
     print(f"\n🏁 Finished. Successfully processed: {success_count}/{len(tenants)}")
+    return success_count == len(tenants)
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Collect daily metrics into metrics_dailies.")
+    parser.add_argument(
+        "--mode",
+        choices=("tenant", "bulk", "incremental"),
+        default="tenant",
+        help=(
+            "tenant: concurrent per-tenant queries; bulk: one grouped query and one upsert; "
+            "incremental: only days changed since the last watermark"
+        ),
+    )
+    parser.add_argument(
+        "--from",
+        dest="date_from",
+        type=date.fromisoformat,
+        help="Backfill start date (YYYY-MM-DD)",
+    )
+    parser.add_argument(
+        "--to",
+        dest="date_to",
+        type=date.fromisoformat,
+        help="Backfill end date (YYYY-MM-DD), defaults to yesterday",
+    )
+    parser.add_argument(
+        "--chunk-days",
+        type=int,
+        default=7,
+        help="Days per query and upsert for backfill/incremental runs (default 7)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.date_to and not args.date_from:
+        parser.error("--to requires --from")
+    if args.date_from and args.mode == "incremental":
+        parser.error("--from/--to cannot be combined with --mode incremental")
+    if args.date_from:
+        args.date_to = args.date_to or date.today() - timedelta(days=1)
+        if args.date_to < args.date_from:
+            parser.error("--to must not be before --from")
+        if args.date_to >= date.today():
+            parser.error("--to must be before today (open days are not rolled up)")
+    return args
+
+async def run(args: argparse.Namespace) -> bool:
+    """Dispatch CLI arguments to a collector run."""
+    if args.date_from:
+        return await backfill(args.date_from, args.date_to, args.chunk_days)
+    if args.mode == "incremental":
+        return await incremental(args.chunk_days)
+    return await main(mode=args.mode)
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    try:
+        ok = asyncio.run(run(args))
+    finally:
+        shutdown_executor()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,347 @@
+"""Live dashboard updates.
+
+Refresh loop: one background task per tenant with connected viewers
+refreshes the overview aggregates on an interval
+(settings.live_refresh_interval) and pushes them to every subscribed
+client of that tenant. Backend load depends on the number of active
+tenants and distinct date ranges, not on the number of open tabs. The
+task stops when the last subscriber leaves.
+
+Change feed: wishlist_v2 inserts, updates and deletes arrive from a
+change source (Supabase Realtime, or an in-process stand-in selected with
+settings.wishlist_feed) and are routed to the open wishlist pages of the
+row's tenant, which patch themselves without re-querying.
+"""
+
+import asyncio
+import inspect
+from typing import Callable
+
+from nicegui import background_tasks, ui
+
+import data_async
+from cache import invalidate_tenant
+from config import settings
+
+# Topics a page can subscribe to
+OVERVIEW = "overview"  # kpi + funnel for the subscriber's date range
+
+
+# ============================================================
+# Refresh Loop
+# ============================================================
+
+
+class Subscription:
+    """A client's interest in a tenant's live data.
+
+    Only receives updates between open() and close(); both are idempotent.
+    """
+
+    def __init__(self, tenant_id: str, topic: str, callback: Callable[[dict], object]):
+        self.tenant_id = tenant_id
+        self.topic = topic
+        self.callback = callback
+        self.feed: TenantFeed | None = None
+        self.date_from: str | None = None
+        self.date_to: str | None = None
+
+    def set_range(self, date_from: str | None, date_to: str | None) -> None:
+        """Follow another date range from the next refresh on."""
+        self.date_from = date_from
+        self.date_to = date_to
+
+    def open(self) -> None:
+        if self.feed is None:
+            self.feed = _feeds.get(self.tenant_id)
+            if self.feed is None:
+                self.feed = _feeds[self.tenant_id] = TenantFeed(self.tenant_id)
+            self.feed.add(self)
+
+    def close(self) -> None:
+        if self.feed is not None:
+            self.feed.remove(self)
+            self.feed = None
+
+
+class TenantFeed:
+    """Refresh loop shared by all subscribers of one tenant."""
+
+    def __init__(self, tenant_id: str):
+        self.tenant_id = tenant_id
+        self.subscriptions: list[Subscription] = []
+        self.task: asyncio.Task | None = None
+
+    def add(self, subscription: Subscription) -> None:
+        self.subscriptions.append(subscription)
+        if self.task is None or self.task.done():
+            self.task = background_tasks.create(self._run(), name=f"live-{self.tenant_id}")
+
+    def remove(self, subscription: Subscription) -> None:
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+        if not self.subscriptions:
+            if self.task is not None:
+                self.task.cancel()
+                self.task = None
+            _feeds.pop(self.tenant_id, None)
+
+    async def _run(self) -> None:
+        while self.subscriptions:
+            await asyncio.sleep(settings.live_refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Error refreshing live data for tenant {self.tenant_id}: {e}")
+
+    async def refresh(self) -> None:
+        """Query every distinct view once and push it to its subscribers."""
+        subscriptions = list(self.subscriptions)
+
+        # Drop cached aggregates so viewers see new data, and so pages
+        # opened right after reuse what this refresh loads
+        invalidate_tenant(self.tenant_id, "kpi_summary", "funnel")
+
+        ranges = list({(s.date_from, s.date_to) for s in subscriptions if s.topic == OVERVIEW})
+
+        async def overview(date_from, date_to) -> dict | None:
+            # load_* raise instead of returning zeros; a failed range is
+            # skipped so its clients keep their last good values
+            try:
+                kpi, funnel = await asyncio.gather(
+                    data_async.load_kpi_summary(self.tenant_id, date_from=date_from, date_to=date_to),
+                    data_async.load_funnel_data(self.tenant_id, date_from=date_from, date_to=date_to),
+                )
+            except Exception as e:
+                print(f"Error refreshing live data for tenant {self.tenant_id}: {e}")
+                return None
+            return {"kpi": kpi, "funnel": funnel}
+
+        results = await asyncio.gather(*(overview(*r) for r in ranges))
+        updates = dict(zip(ranges, results))
+
+        for subscription in subscriptions:
+            update = updates.get((subscription.date_from, subscription.date_to))
+            # Query failed, range changed or client left while querying:
+            # skip this round
+            if update is None or subscription not in self.subscriptions:
+                continue
+            try:
+                result = subscription.callback(update)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print(f"Error pushing live data to a client: {e}")
+
+
+# Active feeds by tenant id
+_feeds: dict[str, TenantFeed] = {}
+
+
+def _while_connected(start: Callable[[], None], stop: Callable[[], None]) -> None:
+    """Hold a live subscription for the lifetime of the current client.
+
+    It starts when the client connects, so a page whose websocket never
+    connects holds nothing, and stops when NiceGUI deletes the client;
+    brief websocket drops keep it. NiceGUI versions without
+    Client.on_delete stop it on disconnect and start it again on reconnect.
+    Both callbacks must be idempotent.
+    """
+    client = ui.context.client
+    client.on_connect(start)
+    if hasattr(client, "on_delete"):
+        client.on_delete(stop)
+    else:
+        client.on_disconnect(stop)
+    if client.has_socket_connection:
+        start()
+
+
+def subscribe(tenant_id: str, topic: str, callback: Callable[[dict], object]) -> Subscription:
+    """Push live data of a tenant to the current client while it exists.
+
+    Must be called from a page handler. The callback receives a dict:
+    {"kpi", "funnel"} for OVERVIEW.
+    """
+    subscription = Subscription(tenant_id, topic, callback)
+    _while_connected(subscription.open, subscription.close)
+    return subscription
+
+
+# ============================================================
+# Wishlist Change Feed
+# ============================================================
+
+
+def _parse_change(payload: dict) -> tuple[str, dict | None, dict | None]:
+    """Normalize a Realtime postgres_changes payload to (event, new, old)."""
+    change = payload.get("data", payload)
+    event = (change.get("type") or change.get("eventType") or "").upper()
+    new = change.get("record") or change.get("new") or None
+    old = change.get("old_record") or change.get("old") or None
+    return event, new, old
+
+
+class RealtimeChangeSource:
+    """wishlist_v2 changes from a Supabase Realtime channel.
+
+    Needs the table in the supabase_realtime publication with REPLICA
+    IDENTITY FULL (see db/rpc_dashboard_metrics.sql), so updates and
+    deletes carry the old row for KPI deltas.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._channel = None
+
+    async def start(self, on_change: Callable[[str, dict | None, dict | None], None]) -> None:
+        from supabase import acreate_client
+
+        self._client = await acreate_client(settings.supabase_url, settings.supabase_service_key)
+        self._channel = self._client.channel("dashboard-wishlist")
+        self._channel.on_postgres_changes(
+            "*",
+            schema="public",
+            table="wishlist_v2",
+            callback=lambda payload: on_change(*_parse_change(payload)),
+        )
+        await self._channel.subscribe()
+
+    async def stop(self) -> None:
+        client, channel = self._client, self._channel
+        self._client = None
+        self._channel = None
+        if client is not None and channel is not None:
+            await client.remove_channel(channel)
+
+
+class LocalChangeSource:
+    """In-process stand-in for Realtime, for tests and local development.
+
+    Changes are fed with publish(), which is safe to call from any thread.
+    """
+
+    def __init__(self):
+        self._on_change = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def start(self, on_change: Callable[[str, dict | None, dict | None], None]) -> None:
+        self._on_change = on_change
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        self._on_change = None
+
+    def publish(self, event: str, new: dict | None = None, old: dict | None = None) -> None:
+        """Emit an INSERT, UPDATE or DELETE of a wishlist_v2 row."""
+        if self._on_change is None or self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._on_change, event.upper(), new, old)
+
+
+class ChangeFeed:
+    """Routes wishlist_v2 changes to the subscribed pages of the row's tenant.
+
+    The source runs only while at least one page is subscribed. Starts and
+    stops are serialized by a lock and decided from the subscribers present
+    once it is held, so quick subscribe/unsubscribe sequences cannot leave
+    the source running with nobody listening, or stopped with listeners.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self._subscribers: dict[str, list[Callable]] = {}
+        self._running = False
+        self._lock = asyncio.Lock()
+
+    def subscribe(self, tenant_id: str, callback: Callable) -> None:
+        """Register callback(event, new, old) for a tenant's changes."""
+        callbacks = self._subscribers.setdefault(tenant_id, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+        if not self._running:
+            background_tasks.create(self._sync(), name="wishlist-feed")
+
+    def unsubscribe(self, tenant_id: str, callback: Callable) -> None:
+        """Remove a callback; stops the source after the last one."""
+        callbacks = self._subscribers.get(tenant_id, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self._subscribers.pop(tenant_id, None)
+        # Also when not running yet: a start may be in progress
+        if not self._subscribers:
+            background_tasks.create(self._sync(), name="wishlist-feed")
+
+    async def stop(self) -> None:
+        async with self._lock:
+            if self._running:
+                self._running = False
+                await self.source.stop()
+
+    async def _sync(self) -> None:
+        """Start or stop the source to match whether anyone is subscribed."""
+        async with self._lock:
+            if self._subscribers and not self._running:
+                try:
+                    await self.source.start(self._dispatch)
+                    self._running = True
+                except Exception as e:
+                    print(f"Error starting wishlist change feed: {e}")
+                    # Release whatever the failed start managed to open
+                    await self.source.stop()
+            elif not self._subscribers and self._running:
+                self._running = False
+                await self.source.stop()
+
+    def _dispatch(self, event: str, new: dict | None, old: dict | None) -> None:
+        row = new or old or {}
+        tenant_id = str(row.get("tenant_id"))
+        # Open pages apply the change themselves; pages opened next must
+        # not read counters cached before it
+        invalidate_tenant(tenant_id, "wishlist_stats")
+        for callback in list(self._subscribers.get(tenant_id, [])):
+            try:
+                result = callback(event, new, old)
+                if inspect.isawaitable(result):
+                    background_tasks.create(result, name="wishlist-change")
+            except Exception as e:
+                print(f"Error applying wishlist change: {e}")
+
+
+# Singleton change feed
+_wishlist_feed: ChangeFeed | None = None
+
+
+def get_wishlist_feed() -> ChangeFeed:
+    """Get the wishlist change feed (singleton pattern)."""
+    global _wishlist_feed
+    if _wishlist_feed is None:
+        if settings.wishlist_feed == "local":
+            _wishlist_feed = ChangeFeed(LocalChangeSource())
+        else:
+            _wishlist_feed = ChangeFeed(RealtimeChangeSource())
+    return _wishlist_feed
+
+
+def subscribe_wishlist(tenant_id: str, callback: Callable) -> None:
+    """Apply wishlist changes of a tenant on the current client while it exists.
+
+    Must be called from a page handler. The callback receives
+    (event, new_row, old_row) with event "INSERT", "UPDATE" or "DELETE".
+    """
+    feed = get_wishlist_feed()
+    _while_connected(
+        lambda: feed.subscribe(tenant_id, callback),
+        lambda: feed.unsubscribe(tenant_id, callback),
+    )
+
+
+async def stop_all() -> None:
+    """Stop refresh loops and the change feed. Registered on app shutdown in main.py."""
+    for feed in list(_feeds.values()):
+        if feed.task is not None:
+            feed.task.cancel()
+    _feeds.clear()
+    if _wishlist_feed is not None:
+        await _wishlist_feed.stop()
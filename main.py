@@ -2,6 +2,10 @@
 
 from nicegui import app, ui
 from config import settings
+from data import get_rpc_client, close_rpc_client
+from data_async import shutdown_executor
+from auth import shutdown_password_executor
+from live import stop_all as stop_live_updates
 
 # Import pages (registers routes via decorators)
 from pages import login
@@ -12,6 +16,12 @@ from pages import settings as settings_page_module
 from pages import users
 
 
+app.on_startup(get_rpc_client)
+app.on_shutdown(close_rpc_client)
+app.on_shutdown(shutdown_executor)
+app.on_shutdown(shutdown_password_executor)
+app.on_shutdown(stop_live_updates)
+
 
 @ui.page("/")
 def index():
@@ -27,7 +27,11 @@ class DailyMetrics(BaseModel):
     dialogs_started: int = 0
     bookings: int = 0
     conversion: float = 0.0
+    revenue: float = 0.0
+    response_count: int = 0
     avg_response_ms: int = 0
+    p50_response_ms: int = 0
+    p95_response_ms: int = 0
 
 
 class ConversationSession(BaseModel):
@@ -1,4 +1,4 @@
-"""Overview page with KPI cards and funnel chart."""
+"""Overview page with KPI cards, trend chart and funnel chart."""
 
 from nicegui import ui, app
 from datetime import date, timedelta
@@ -6,8 +6,11 @@ from datetime import date, timedelta
 from auth import require_auth
 from components.layout import page_layout
 from components.kpi_card import kpi_card
-from components.funnel_chart import funnel_chart
-from data import get_kpi_summary, get_funnel_data
+from components.funnel_chart import funnel_chart, update_funnel_chart
+from components.trend_chart import trend_chart
+from components.page_loader import PageLoader
+import live
+from data_async import load_kpi_summary, load_funnel_data, load_metrics_trend
 
 
 @ui.page("/overview")
@@ -25,38 +28,99 @@ async def overview_page():
     date_from_input = None
     date_to_input = None
     kpi_row = None
+    trend_container = None
     funnel_container = None
+    live_updates = None
+    
+    # Widgets built by the first load; later refreshes update them in place
+    kpi_cards = {}
+    funnel = None
+    
+    def render_kpi(kpi: dict):
+        """KPI cards for the selected range."""
+        values = [
+            ("Сессии", kpi["sessions"], "chat"),
+            ("Записи", kpi["bookings"], "event_available"),
+            ("Конверсия", f"{kpi['conversion']}%", "trending_up"),
+            ("Доход", f"{kpi['revenue']:,.0f} ₽", "payments"),
+            (
+                "Ответ бота",
+                f"{kpi['avg_response_ms'] / 1000:.1f} с" if kpi["avg_response_ms"] else "—",
+                "timer",
+            ),
+        ]
+        if kpi_cards:
+            for title, value, _ in values:
+                kpi_cards[title].set_value(value)
+            return
+        kpi_row.clear()
+        with kpi_row:
+            for title, value, icon in values:
+                kpi_cards[title] = kpi_card(title, value, icon=icon)
+    
+    def render_funnel(data: dict):
+        """Funnel chart for the selected range."""
+        nonlocal funnel
+        if funnel is not None:
+            update_funnel_chart(funnel, data)
+            return
+        funnel_container.clear()
+        with funnel_container:
+            funnel = funnel_chart(data)
     
     async def refresh_data():
-        """Refresh all data based on selected date range."""
-        nonlocal date_from_input, date_to_input, kpi_row, funnel_container
+        """Refresh all widgets for the selected date range.
+        
+        The KPI, trend and funnel queries run concurrently; each widget
+        renders as soon as its own data arrives.
+        """
+        nonlocal date_from_input, date_to_input, kpi_row, trend_container, funnel_container
         
         date_from = date_from_input.value if date_from_input else None
         date_to = date_to_input.value if date_to_input else None
+        if live_updates:
+            live_updates.set_range(date_from, date_to)
         
-        # Clear and rebuild KPI cards
-        if kpi_row:
+        if not tenant_id:
             kpi_row.clear()
             with kpi_row:
-                if tenant_id:
-                    kpi = get_kpi_summary(tenant_id, date_from=date_from, date_to=date_to)
-                    
-                    kpi_card("Сессии", kpi["sessions"], icon="chat")
-                    kpi_card("Записи", kpi["bookings"], icon="event_available")
-                    kpi_card("Конверсия", f"{kpi['conversion']}%", icon="trending_up")
-                    kpi_card("Доход", f"{kpi['revenue']:,.0f} ₽", icon="payments")
-                else:
-                    ui.label("Tenant не настроен").classes("text-warning")
-        
-        # Clear and rebuild funnel
-        if funnel_container:
-            funnel_container.clear()
-            with funnel_container:
-                if tenant_id:
-                    funnel_data = get_funnel_data(tenant_id, date_from=date_from, date_to=date_to)
-                    funnel_chart(funnel_data)
-                else:
+                ui.label("Tenant не настроен").classes("text-warning")
+            for container in (trend_container, funnel_container):
+                container.clear()
+                with container:
                     ui.label("Нет данных").classes("text-grey")
+            return
+        
+        # Built widgets keep showing their values while the new ones load;
+        # only the first load shows spinners (and error placeholders).
+        # The load_* queries raise on errors, so failures reach PageLoader
+        await (
+            PageLoader()
+            .add(
+                lambda: load_kpi_summary(tenant_id, date_from=date_from, date_to=date_to),
+                render_kpi,
+                None if kpi_cards else kpi_row,
+                name="kpi_summary",
+            )
+            .add(
+                lambda: load_metrics_trend(tenant_id, date_from=date_from, date_to=date_to),
+                trend_chart,
+                trend_container,
+                name="metrics_trend",
+            )
+            .add(
+                lambda: load_funnel_data(tenant_id, date_from=date_from, date_to=date_to),
+                render_funnel,
+                None if funnel is not None else funnel_container,
+                name="funnel",
+            )
+            .run()
+        )
+    
+    def push_update(update: dict):
+        """Show KPIs and funnel pushed by the tenant's live refresh loop."""
+        render_kpi(update["kpi"])
+        render_funnel(update["funnel"])
     
     def set_preset(days: int):
         """Set date preset."""
@@ -111,12 +175,21 @@ async def overview_page():
                 ui.button("Месяц", on_click=lambda: set_preset(30)).props("unelevated dense rounded color=purple-1 text-color=purple-8").classes("dark:bg-purple-900/30 dark:text-purple-300 font-medium")
         
         # KPI Cards container (Grid layout)
-        kpi_row = ui.element('div').classes("grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-4 gap-4 w-full mb-6")
+        kpi_row = ui.element('div').classes("grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-5 gap-4 w-full mb-6")
+        
+        # Trend Chart container
+        with ui.card().classes("w-full p-4 mb-6 bg-white dark:bg-gray-800 rounded-xl border border-gray-200 dark:border-gray-700 shadow-sm"):
+            ui.label("Динамика").classes("text-lg font-semibold mb-4 text-gray-800 dark:text-white")
+            trend_container = ui.column().classes("w-full")
         
         # Funnel Chart container
         with ui.card().classes("w-full p-4 bg-white dark:bg-gray-800 rounded-xl border border-gray-200 dark:border-gray-700 shadow-sm"):
             ui.label("Воронка конверсии").classes("text-lg font-semibold mb-4 text-gray-800 dark:text-white")
             funnel_container = ui.column().classes("w-full")
         
+        # Live updates from the shared per-tenant refresh loop (see live.py)
+        if tenant_id:
+            live_updates = live.subscribe(tenant_id, live.OVERVIEW, push_update)
+        
         # Initial load
         await refresh_data()
@@ -5,7 +5,7 @@ from datetime import datetime
 from auth import require_auth
 from components.layout import page_layout
 from components.chat_viewer import show_chat_dialog
-from data import get_sessions
+from data_async import get_sessions
 
 
 @ui.page("/sessions")
@@ -15,15 +15,24 @@ async def sessions_page():
 
     tenant_id = app.storage.user.get("tenant_id")
 
-    # Pagination state
-    page_state = {"current": 0, "limit": 20, "total": 0}
+    # Pagination state (keyset: first/last hold the (started_at, id) page bounds)
+    page_state = {
+        "current": 0,
+        "limit": 20,
+        "total": 0,
+        "approximate": False,
+        "cursor": None,
+        "first": None,
+        "last": None,
+        "descending": True,
+    }
 
     # UI element references (will be assigned later)
     status_select = None
     date_from = None
     date_to = None
     stats_label = None
-    table_container = None
+    table = None
     page_label = None
     prev_btn = None
     next_btn = None
@@ -100,14 +109,14 @@ async def sessions_page():
         }
         return mapping.get(intent, intent)
 
-    async def refresh_table():
-        """Refresh sessions table."""
+    async def refresh_table(count_mode: str | None = "auto"):
+        """Refresh sessions table. count_mode=None keeps the known total."""
         nonlocal \
             status_select, \
             date_from, \
             date_to, \
             stats_label, \
-            table_container, \
+            table, \
             page_label, \
             prev_btn, \
             next_btn
@@ -115,110 +124,132 @@ async def sessions_page():
         if not tenant_id:
             return
 
+        filters = {
+            "status_filter": status_select.value
+            if status_select and status_select.value != "all"
+            else None,
+            "date_from": date_from.value if date_from and date_from.value else None,
+            "date_to": date_to.value if date_to and date_to.value else None,
+        }
+        cursor = page_state["cursor"] or {}
+
         # Get data
-        data, total = get_sessions(
+        data, total, approximate = await get_sessions(
             tenant_id=tenant_id,
             limit=page_state["limit"],
-            offset=page_state["current"] * page_state["limit"],
-            status_filter=status_select.value
-            if status_select and status_select.value != "all"
-            else None,
-            date_from=date_from.value if date_from and date_from.value else None,
-            date_to=date_to.value if date_to and date_to.value else None,
+            count_mode=count_mode,
+            descending=page_state["descending"],
+            **filters,
+            **cursor,
         )
 
-        page_state["total"] = total
+        # Short page going back means we reached the newest sessions
+        if cursor.get("before") and len(data) < page_state["limit"]:
+            page_state["current"] = 0
+            page_state["cursor"] = None
+            data, total, approximate = await get_sessions(
+                tenant_id=tenant_id,
+                limit=page_state["limit"],
+                count_mode=count_mode,
+                descending=page_state["descending"],
+                **filters,
+            )
+
+        if total is not None:
+            page_state["total"] = total
+            page_state["approximate"] = approximate
+        total = page_state["total"]
+        approx = "~" if page_state["approximate"] else ""
+        page_state["first"] = (data[0]["started_at"], data[0]["id"]) if data else None
+        page_state["last"] = (data[-1]["started_at"], data[-1]["id"]) if data else None
         total_pages = max(1, (total + page_state["limit"] - 1) // page_state["limit"])
 
         # Update stats
         if stats_label:
-            stats_label.text = f"Найдено: {total} сессий"
+            stats_label.text = f"Найдено: {approx}{total} сессий"
         if page_label:
             # Simple "1 / 5" style
-            page_label.text = f"{page_state['current'] + 1} / {total_pages}"
+            page_label.text = f"{page_state['current'] + 1} / {approx}{total_pages}"
 
         # Update pagination buttons
         if prev_btn:
             prev_btn.set_enabled(page_state["current"] > 0)
         if next_btn:
-            next_btn.set_enabled(page_state["current"] < total_pages - 1)
-
-        # Rebuild table
-        if table_container:
-            table_container.clear()
-            with table_container:
-                if not data:
-                    ui.label("Нет данных").classes("text-grey text-center py-8")
-                    return
-
-                # Table header
-                with ui.row().classes(
-                    "w-full bg-gray-100 dark:bg-gray-800 py-3 px-4 rounded-t-lg gap-4"
-                ):
-                    ui.label("ID").classes(
-                        "w-16 font-semibold text-gray-600 dark:text-gray-300 text-sm"
-                    )
-                    ui.label("Дата").classes(
-                        "w-36 font-semibold text-gray-600 dark:text-gray-300 text-sm"
-                    )
-                    ui.label("Клиент").classes(
-                        "w-40 font-semibold text-gray-600 dark:text-gray-300 text-sm"
-                    )
-                    ui.label("Статус").classes(
-                        "w-32 font-semibold text-gray-600 dark:text-gray-300 text-sm"
-                    )
-                    ui.label("Цель").classes(
-                        "w-40 font-semibold text-gray-600 dark:text-gray-300 text-sm"
-                    )
-                    ui.label("").classes("w-20")
-
-                # Table rows
-                for row in data:
-                    session_id = row.get("session_id")
-                    client_info = row.get("clients_v2") or {}
-                    client_name = client_info.get("full_name") or "—"
-                    summary = row.get("summary") or ""
-
-                    with ui.row().classes(
-                        "w-full py-3 px-4 border-b border-gray-200 dark:border-gray-700 gap-4 hover:bg-gray-50 dark:hover:bg-gray-800/50 items-center transition-colors"
-                    ) as row_el:
-                        if summary:
-                            row_el.tooltip(summary)
-                        ui.label(str(row.get("id", "—"))).classes(
-                            "w-16 text-gray-500 dark:text-gray-400 text-sm"
-                        )
-                        ui.label(format_datetime(row.get("started_at"))).classes(
-                            "w-36 text-gray-800 dark:text-gray-200 text-sm"
-                        )
-                        ui.label(client_name).classes(
-                            "w-40 text-gray-800 dark:text-gray-200 font-medium text-sm"
-                        )
-
-                        # Status badge
-                        status_text, status_class = get_status_badge(
-                            row.get("final_status", "")
-                        )
-                        ui.label(status_text).classes(
-                            f"w-32 px-2 py-1 rounded-full text-xs font-medium text-center {status_class}"
-                        )
-
-                        intent_raw = row.get("final_intent")
-                        intent_label = get_intent_label(intent_raw)
-                        ui.label(intent_label).classes(
-                            "w-40 text-gray-500 dark:text-gray-400 text-sm truncate"
-                        ).tooltip(intent_raw or "—")
-
-                        ui.button(
-                            icon="visibility",
-                            on_click=lambda sid=session_id,
-                            name=client_name,
-                            tid=tenant_id,
-                            s=summary: show_chat_dialog(sid, name, tid, s),
-                        ).props("flat round dense").tooltip("Просмотреть диалог")
+            # An estimated total can be off either way; a full page hints at more
+            next_btn.set_enabled(
+                len(data) == page_state["limit"]
+                if page_state["approximate"]
+                else page_state["current"] < total_pages - 1
+            )
+
+        # Replace table rows in one update; cells are rendered by the slots
+        if table:
+            rows = []
+            for row in data:
+                status_text, status_class = get_status_badge(row.get("final_status", ""))
+                intent_raw = row.get("final_intent")
+                rows.append(
+                    {
+                        "id": row.get("id"),
+                        "session_id": row.get("session_id"),
+                        "started_at": row.get("started_at"),
+                        "started_at_text": format_datetime(row.get("started_at")),
+                        "client": (row.get("clients_v2") or {}).get("full_name") or "—",
+                        "status": status_text,
+                        "status_class": status_class,
+                        "intent": get_intent_label(intent_raw),
+                        "intent_raw": intent_raw or "—",
+                        "summary": row.get("summary") or "",
+                    }
+                )
+            table.rows = rows
+            # rowsNumber makes Quasar treat sorting as server-side and emit "request"
+            table.pagination = {**table.pagination, "rowsNumber": total}
+            table.update()
+
+    async def open_chat(e):
+        """Open the chat viewer for the clicked table row."""
+        await show_chat_dialog(e.args["session_id"], tenant_id=tenant_id)
+
+    async def sort_table(e):
+        """Server-side sort by date: Quasar asks, we refetch from the first page."""
+        pagination = e.args.get("pagination") or {}
+        # Third click on the header clears sortBy; fall back to newest first
+        page_state["descending"] = (
+            bool(pagination.get("descending"))
+            if pagination.get("sortBy") == "started_at"
+            else True
+        )
+        table.pagination = {
+            **table.pagination,
+            "sortBy": "started_at",
+            "descending": page_state["descending"],
+        }
+        await apply_filters()
+
+    async def set_page_size(e):
+        """Change rows per page and start over from the first page."""
+        page_state["limit"] = e.value
+        await apply_filters()
 
     async def go_page(delta: int):
-        """Navigate to next/prev page."""
-        page_state["current"] = max(0, page_state["current"] + delta)
+        """Navigate to next/prev page using the current page bounds as cursor."""
+        if delta > 0 and page_state["last"]:
+            page_state["current"] += 1
+            page_state["cursor"] = {"after": page_state["last"]}
+        elif delta < 0 and page_state["current"] > 0 and page_state["first"]:
+            page_state["current"] -= 1
+            page_state["cursor"] = (
+                {"before": page_state["first"]} if page_state["current"] else None
+            )
+        else:
+            return
+        await refresh_table(count_mode=None)
+
+    async def apply_filters():
+        """Apply filters starting from the first page."""
+        page_state["current"] = 0
+        page_state["cursor"] = None
         await refresh_table()
 
     async def reset_filters():
@@ -230,8 +261,7 @@ async def sessions_page():
             date_from.value = ""
         if date_to:
             date_to.value = ""
-        page_state["current"] = 0
-        await refresh_table()
+        await apply_filters()
 
     # Inject locale
     import json
@@ -300,7 +330,7 @@ async def sessions_page():
 
             ui.space()
 
-            ui.button(icon="search", on_click=refresh_table).props(
+            ui.button(icon="search", on_click=apply_filters).props(
                 "flat round color=purple"
             ).tooltip("Найти")
             ui.button(icon="restart_alt", on_click=reset_filters).props(
@@ -310,8 +340,63 @@ async def sessions_page():
         # Stats row
         stats_label = ui.label().classes("text-grey mb-2")
 
-        # Table container
-        table_container = ui.column().classes("w-full")
+        # Sessions table: one component, rows sent as a single JSON payload
+        columns = [
+            {"name": "id", "label": "ID", "field": "id", "align": "left"},
+            {"name": "started_at", "label": "Дата", "field": "started_at", "sortable": True, "align": "left"},
+            {"name": "client", "label": "Клиент", "field": "client", "align": "left"},
+            {"name": "status", "label": "Статус", "field": "status", "align": "left"},
+            {"name": "intent", "label": "Цель", "field": "intent", "align": "left"},
+            {"name": "actions", "label": "", "field": "actions", "align": "center"},
+        ]
+        table = (
+            ui.table(
+                columns=columns,
+                rows=[],
+                row_key="id",
+                pagination={
+                    "sortBy": "started_at",
+                    "descending": True,
+                    "rowsPerPage": 0,
+                    "rowsNumber": 0,
+                },
+            )
+            .props('flat virtual-scroll hide-pagination no-data-label="Нет данных"')
+            .classes("w-full theme-card")
+            .style("max-height: 70vh")
+        )
+        table.add_slot("body-cell-started_at", r'''
+            <q-td :props="props">{{ props.row.started_at_text }}</q-td>
+        ''')
+        table.add_slot("body-cell-client", r'''
+            <q-td :props="props" class="font-medium">
+                {{ props.value }}
+                <q-tooltip v-if="props.row.summary" max-width="320px">{{ props.row.summary }}</q-tooltip>
+            </q-td>
+        ''')
+        table.add_slot("body-cell-status", r'''
+            <q-td :props="props">
+                <span :class="'px-2 py-1 rounded-full text-xs font-medium ' + props.row.status_class">
+                    {{ props.value }}
+                </span>
+            </q-td>
+        ''')
+        table.add_slot("body-cell-intent", r'''
+            <q-td :props="props" class="text-gray-500 dark:text-gray-400">
+                {{ props.value }}
+                <q-tooltip>{{ props.row.intent_raw }}</q-tooltip>
+            </q-td>
+        ''')
+        table.add_slot("body-cell-actions", r'''
+            <q-td :props="props">
+                <q-btn icon="visibility" flat round dense
+                    @click="$parent.$emit('open_chat', {session_id: props.row.session_id})">
+                    <q-tooltip>Просмотреть диалог</q-tooltip>
+                </q-btn>
+            </q-td>
+        ''')
+        table.on("open_chat", open_chat)
+        table.on("request", sort_table)
 
         # Pagination
         with ui.row().classes("w-full justify-center items-center gap-4 mt-6"):
@@ -328,6 +413,12 @@ async def sessions_page():
                 .props("round flat color=grey-7")
                 .classes("dark:text-gray-300 hover:bg-gray-200 dark:hover:bg-gray-700")
             )
+            ui.select(
+                [20, 50, 100],
+                value=page_state["limit"],
+                label="На странице",
+                on_change=set_page_size,
+            ).classes("w-32").props("outlined dense color=purple options-dense")
 
         # Initial load
         await refresh_table()
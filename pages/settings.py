@@ -3,7 +3,7 @@
 from nicegui import ui, app
 from auth import require_auth
 from components.layout import page_layout
-from data import get_tenant_settings, update_tenant_metadata
+from data_async import get_tenant_settings, update_tenant_metadata
 
 
 @ui.page("/settings")
@@ -24,7 +24,7 @@ async def settings_page():
         return
     
     # Load tenant data
-    tenant = get_tenant_settings(tenant_id)
+    tenant = await get_tenant_settings(tenant_id)
     if not tenant:
         ui.label("Салон не найден").classes("text-h5 text-red")
         return
@@ -86,7 +86,7 @@ async def settings_page():
             }
             
             # Pass authorization parameters
-            if update_tenant_metadata(
+            if await update_tenant_metadata(
                 tenant_id, 
                 updated_metadata,
                 user_role=user_role,
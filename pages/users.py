@@ -2,7 +2,7 @@
 from nicegui import ui, app
 from auth import require_auth
 from components.layout import page_layout
-from data import get_all_users, create_user, delete_user, get_tenants
+from data_async import get_all_users, create_user, delete_user, get_tenants
 
 @ui.page("/users")
 @require_auth()
@@ -33,7 +33,7 @@ async def users_page():
              ui.notify("Для этой роли необходимо выбрать Салон", type="warning")
              return
         
-        success, msg = create_user(data)
+        success, msg = await create_user(data)
         if success:
             ui.notify("Пользователь создан успешно!", type="positive")
             dialog.close()
@@ -48,14 +48,14 @@ async def users_page():
 
     async def delete_handler(e):
         user_id = e.args
-        if delete_user(user_id):
+        if await delete_user(user_id):
             ui.notify("Пользователь удален", type="positive")
             await refresh_table()
         else:
             ui.notify("Ошибка при удалении", type="negative")
 
     async def refresh_table():
-        rows = get_all_users()
+        rows = await get_all_users()
         # Enrich tenant names if possible, but simplest is showing ID or just basic info
         table.rows = rows
         table.update()
@@ -116,7 +116,7 @@ async def users_page():
                 ui.separator().classes("bg-gray-700 my-2")
                 
                 # Fetch tenants for select
-                tenants_list = get_tenants()
+                tenants_list = await get_tenants()
                 tenant_options = {t['id']: t['name'] for t in tenants_list}
                 tenant = ui.select(tenant_options, label="Салон (Tenant)", clearable=True).classes("w-full").props("outlined dark options-dense")
                 
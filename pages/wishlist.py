@@ -5,7 +5,9 @@ from datetime import datetime
 from auth import require_auth
 from components.layout import page_layout
 from components.kpi_card import kpi_card
-from data import get_wishlist_items, update_wishlist_status, delete_wishlist_item, get_wishlist_stats
+from components.page_loader import PageLoader
+import live
+from data_async import get_wishlist_items, get_wishlist_item, update_wishlist_status, delete_wishlist_item, get_wishlist_stats, load_wishlist_items, load_wishlist_stats
 
 
 @ui.page("/wishlist")
@@ -16,7 +18,15 @@ async def wishlist_page():
     tenant_id = app.storage.user.get("tenant_id")
     
     # Pagination state
-    page_state = {"current": 0, "limit": 20, "total": 0}
+    page_state = {"current": 0, "limit": 20, "total": 0, "approximate": False}
+    
+    # Rows of the current page and their elements, by item id (for in-place patches)
+    page_items: dict[int, dict] = {}
+    row_elements: dict[int, ui.row] = {}
+    row_classes = "w-full py-3 px-4 border-b border-gray-200 dark:border-gray-700 gap-4 hover:bg-gray-50 dark:hover:bg-gray-800/50 items-center transition-colors"
+    
+    # Changes made on this page, by item id: the change feed echoes them back
+    own_changes: dict[int, str | None] = {}
     
     # UI element references (will be assigned later)
     status_select = None
@@ -65,41 +75,126 @@ async def wishlist_page():
         }
         return mapping.get(status, (status, "bg-gray-100 text-gray-600 dark:bg-gray-700 dark:text-gray-400"))
     
-    async def refresh_table():
-        """Refresh wishlist table."""
-        nonlocal status_select, stats_label, table_container, page_label, prev_btn, next_btn
-        
-        if not tenant_id:
-            return
-        
-        data, total = get_wishlist_items(
-            tenant_id=tenant_id,
-            status_filter=status_select.value if status_select else "pending",
-            limit=page_state["limit"],
-            offset=page_state["current"] * page_state["limit"],
-        )
-        
-        page_state["total"] = total
+    def update_pager(rows_on_page: int):
+        """Update the found counter, page label and pagination buttons."""
+        total = page_state["total"]
+        approx = "~" if page_state["approximate"] else ""
         total_pages = max(1, (total + page_state["limit"] - 1) // page_state["limit"])
         
         if stats_label:
-            stats_label.text = f"Найдено: {total} заявок"
+            stats_label.text = f"Найдено: {approx}{total} заявок"
         if page_label:
             # Simple "1 / 5" style
-            page_label.text = f"{page_state['current'] + 1} / {total_pages}"
+            page_label.text = f"{page_state['current'] + 1} / {approx}{total_pages}"
         
         if prev_btn:
             prev_btn.set_enabled(page_state["current"] > 0)
         if next_btn:
-            next_btn.set_enabled(page_state["current"] < total_pages - 1)
+            # An estimated total can be off either way; a full page hints at more
+            next_btn.set_enabled(
+                rows_on_page == page_state["limit"]
+                if page_state["approximate"]
+                else page_state["current"] < total_pages - 1
+            )
+    
+    def render_row_cells(row: dict):
+        """Build the cells of one table row in the current container."""
+        item_id = row.get("id")
+        client_info = row.get("clients_v2") or {}
+        client_name = client_info.get("full_name") or "—"
+        client_phone = client_info.get("phone") or "—"
+        
+        # Extract human-readable data from meta JSON
+        meta = row.get("meta") or {}
+        service_title = meta.get("service_title") or row.get("item_id") or "—"
+        staff_name = meta.get("staff_name") or "—"
+        preferred_date = format_date(meta.get("date"))
+        time_pref = format_time_preference(meta.get("time_preference"))
+        
+        ui.label(client_name).classes("w-32 font-medium text-gray-800 dark:text-gray-200 text-sm truncate")
+        ui.label(service_title).classes("w-44 text-gray-800 dark:text-gray-200 text-sm truncate").tooltip(service_title)
+        ui.label(staff_name).classes("w-24 text-gray-500 dark:text-gray-400 text-sm truncate")
+        ui.label(preferred_date).classes("w-28 text-gray-800 dark:text-gray-200 text-sm")
+        ui.label(time_pref).classes("w-16 text-gray-500 dark:text-gray-400 text-sm")
+        
+        # Status badge
+        status_text, status_class = get_status_badge(row.get("status", ""))
+        ui.label(status_text).classes(f"w-24 px-2 py-1 rounded-full text-xs font-medium text-center {status_class}")
+        
+        with ui.row().classes("w-28 gap-1"):
+            # Mark processed button
+            if row.get("status") == "pending":
+                ui.button(
+                    icon="check",
+                    on_click=lambda iid=item_id: mark_processed(iid)
+                ).props("flat round dense color=positive").tooltip("Обработано")
+                
+                # Cancel button
+                ui.button(
+                    icon="close",
+                    on_click=lambda iid=item_id: mark_cancelled(iid)
+                ).props("flat round dense color=warning").tooltip("Отменить")
+            
+            # Contact button
+            ui.button(
+                icon="phone",
+                on_click=lambda name=client_name, phone=client_phone: show_contact_dialog(name, phone)
+            ).props("flat round dense color=info").tooltip("Контакт")
+            
+            # Delete button
+            ui.button(
+                icon="delete",
+                on_click=lambda iid=item_id: confirm_delete(iid)
+            ).props("flat round dense color=negative").tooltip("Удалить")
+    
+    def render_empty():
+        """Show the empty-table placeholder."""
+        table_container.clear()
+        with table_container:
+            ui.label("Нет заявок").classes("text-grey text-center py-8")
+    
+    async def fetch_table(
+        count_mode: str | None = "auto", strict: bool = False
+    ) -> tuple[list[dict], int | None, bool]:
+        """Query the current page. count_mode=None keeps the known total.
+
+        strict=True raises on errors instead of returning an empty page.
+        """
+        query = load_wishlist_items if strict else get_wishlist_items
+        return await query(
+            tenant_id=tenant_id,
+            status_filter=status_select.value if status_select else "pending",
+            limit=page_state["limit"],
+            offset=page_state["current"] * page_state["limit"],
+            count_mode=count_mode,
+        )
+    
+    async def refresh_table(count_mode: str | None = "auto"):
+        """Refresh wishlist table. count_mode=None keeps the known total."""
+        if not tenant_id:
+            return
+        render_table(await fetch_table(count_mode))
+    
+    def render_table(result: tuple[list[dict], int | None, bool]):
+        """Show a fetched page: counters, pager and rows."""
+        nonlocal status_select, stats_label, table_container, page_label, prev_btn, next_btn
+        
+        data, total, approximate = result
+        if total is not None:
+            page_state["total"] = total
+            page_state["approximate"] = approximate
+        update_pager(len(data))
+        
+        page_items.clear()
+        row_elements.clear()
         
         if table_container:
+            if not data:
+                render_empty()
+                return
+            
             table_container.clear()
             with table_container:
-                if not data:
-                    ui.label("Нет заявок").classes("text-grey text-center py-8")
-                    return
-                
                 # Table header
                 with ui.row().classes("w-full bg-gray-100 dark:bg-gray-800 py-3 px-4 rounded-t-lg gap-4"):
                     ui.label("Клиент").classes("w-32 font-semibold text-gray-600 dark:text-gray-300 text-sm")
@@ -112,54 +207,124 @@ async def wishlist_page():
                 
                 # Table rows
                 for row in data:
-                    item_id = row.get("id")
-                    client_info = row.get("clients_v2") or {}
-                    client_name = client_info.get("full_name") or "—"
-                    client_phone = client_info.get("phone") or "—"
-                    
-                    # Extract human-readable data from meta JSON
-                    meta = row.get("meta") or {}
-                    service_title = meta.get("service_title") or row.get("item_id") or "—"
-                    staff_name = meta.get("staff_name") or "—"
-                    preferred_date = format_date(meta.get("date"))
-                    time_pref = format_time_preference(meta.get("time_preference"))
-                    
-                    with ui.row().classes("w-full py-3 px-4 border-b border-gray-200 dark:border-gray-700 gap-4 hover:bg-gray-50 dark:hover:bg-gray-800/50 items-center transition-colors"):
-                        ui.label(client_name).classes("w-32 font-medium text-gray-800 dark:text-gray-200 text-sm truncate")
-                        ui.label(service_title).classes("w-44 text-gray-800 dark:text-gray-200 text-sm truncate").tooltip(service_title)
-                        ui.label(staff_name).classes("w-24 text-gray-500 dark:text-gray-400 text-sm truncate")
-                        ui.label(preferred_date).classes("w-28 text-gray-800 dark:text-gray-200 text-sm")
-                        ui.label(time_pref).classes("w-16 text-gray-500 dark:text-gray-400 text-sm")
-                        
-                        # Status badge
-                        status_text, status_class = get_status_badge(row.get("status", ""))
-                        ui.label(status_text).classes(f"w-24 px-2 py-1 rounded-full text-xs font-medium text-center {status_class}")
-                        
-                        with ui.row().classes("w-28 gap-1"):
-                            # Mark processed button
-                            if row.get("status") == "pending":
-                                ui.button(
-                                    icon="check",
-                                    on_click=lambda iid=item_id: mark_processed(iid)
-                                ).props("flat round dense color=positive").tooltip("Обработано")
-                                
-                                # Cancel button
-                                ui.button(
-                                    icon="close",
-                                    on_click=lambda iid=item_id: mark_cancelled(iid)
-                                ).props("flat round dense color=warning").tooltip("Отменить")
-                            
-                            # Contact button
-                            ui.button(
-                                icon="phone",
-                                on_click=lambda name=client_name, phone=client_phone: show_contact_dialog(name, phone)
-                            ).props("flat round dense color=info").tooltip("Контакт")
-                            
-                            # Delete button
-                            ui.button(
-                                icon="delete",
-                                on_click=lambda iid=item_id: confirm_delete(iid)
-                            ).props("flat round dense color=negative").tooltip("Удалить")
+                    with ui.row().classes(row_classes) as row_el:
+                        render_row_cells(row)
+                    page_items[row["id"]] = row
+                    row_elements[row["id"]] = row_el
+    
+    async def apply_local_change(item_id: int, status: str | None, amount: float | None = None):
+        """Show the result of an action taken on this page, without refetching.
+        
+        status=None means the item was deleted.
+        """
+        own_changes[item_id] = status
+        if item_id not in page_items:
+            # Not on this page (stale click); fall back to a full refresh
+            await refresh_table()
+            await refresh_kpi()
+            return
+        await patch_page(item_id, status, amount)
+    
+    async def patch_page(item_id: int, status: str | None, amount: float | None = None, record: dict | None = None):
+        """Patch or drop one row of this page and shift the KPI counters.
+        
+        status=None means the item was deleted. The page is refetched only
+        when removing the row shifts pagination (a row from the next page
+        moves up, or the page runs empty).
+        """
+        row = page_items[item_id]
+        shift_kpi(row, status, amount)
+        
+        status_filter = status_select.value if status_select else "pending"
+        if status is not None and status_filter in ("all", status):
+            # Row still matches the filter: redraw just its cells
+            row.update(record or {})
+            row["status"] = status
+            if amount is not None:
+                row["amount"] = amount
+            row_el = row_elements[item_id]
+            row_el.clear()
+            with row_el:
+                render_row_cells(row)
+            return
+        
+        # Row left the current view
+        page_items.pop(item_id)
+        row_elements.pop(item_id).delete()
+        page_state["total"] = max(0, page_state["total"] - 1)
+        
+        if not page_items and page_state["current"] > 0:
+            page_state["current"] -= 1
+            await refresh_table(count_mode=None)
+        elif page_state["approximate"] or page_state["total"] >= (page_state["current"] + 1) * page_state["limit"]:
+            await refresh_table(count_mode=None)
+        else:
+            update_pager(len(page_items))
+            if not page_items:
+                render_empty()
+    
+    async def insert_row(item_id: int):
+        """Show a new item at the top of the first page."""
+        row = await get_wishlist_item(item_id, tenant_id)
+        if row is None or item_id in page_items:
+            return
+        if not page_items:
+            # Only the empty placeholder is shown; draw the table from scratch
+            await refresh_table(count_mode=None)
+            return
+        
+        with table_container:
+            with ui.row().classes(row_classes) as row_el:
+                render_row_cells(row)
+        row_el.move(table_container, target_index=1)  # Right under the header
+        
+        previous = list(page_items.items()), list(row_elements.items())
+        page_items.clear()
+        row_elements.clear()
+        page_items[item_id] = row
+        row_elements[item_id] = row_el
+        page_items.update(previous[0])
+        row_elements.update(previous[1])
+        
+        # The last row moves on to the next page
+        if len(page_items) > page_state["limit"]:
+            last_id = next(reversed(page_items))
+            page_items.pop(last_id)
+            row_elements.pop(last_id).delete()
+        update_pager(len(page_items))
+    
+    async def on_wishlist_change(event: str, new: dict | None, old: dict | None):
+        """Apply a wishlist_v2 change from the change feed (see live.py)."""
+        item_id = (new or old or {}).get("id")
+        status = new.get("status") if new and event != "DELETE" else None
+        
+        # Already shown when the action was taken on this page
+        if item_id in own_changes and own_changes[item_id] == status:
+            del own_changes[item_id]
+            return
+        
+        status_filter = status_select.value if status_select else "pending"
+        
+        if item_id in page_items:
+            await patch_page(item_id, status, new.get("amount") if new else None, new)
+            return
+        
+        # Not on this page: only counters change, plus new rows on page one
+        shift_kpi(old or {}, status, new.get("amount") if new else None)
+        matched = bool(old) and event != "INSERT" and status_filter in ("all", old.get("status"))
+        matches = status is not None and status_filter in ("all", status)
+        if matches and not matched:
+            page_state["total"] += 1
+            if event == "INSERT" and page_state["current"] == 0:
+                await insert_row(item_id)
+                # Feed callbacks run in a background task without a slot
+                # context; the table container tells notify which client
+                with table_container:
+                    ui.notify("Новая заявка!", type="info")
+                return
+        elif matched and not matches:
+            page_state["total"] = max(0, page_state["total"] - 1)
+        update_pager(len(page_items))
     
     async def mark_processed(item_id: int):
         """Show amount input dialog and mark item as processed."""
@@ -182,11 +347,10 @@ async def wishlist_page():
                 ui.button("Отмена", on_click=dialog.close).props("flat")
                 
                 async def do_save():
-                    if update_wishlist_status(item_id, "converted", tenant_id, amount=amount_value["value"]):
+                    if await update_wishlist_status(item_id, "converted", tenant_id, amount=amount_value["value"]):
                         ui.notify(f"Заявка обработана: {amount_value['value']:.0f} ₽", type="positive")
                         dialog.close()
-                        await refresh_table()
-                        await refresh_kpi()
+                        await apply_local_change(item_id, "converted", amount_value["value"])
                     else:
                         ui.notify("Ошибка при обновлении", type="negative")
                 
@@ -196,10 +360,9 @@ async def wishlist_page():
     
     async def mark_cancelled(item_id: int):
         """Mark item as cancelled."""
-        if update_wishlist_status(item_id, "cancelled", tenant_id):
+        if await update_wishlist_status(item_id, "cancelled", tenant_id):
             ui.notify("Заявка отменена", type="warning")
-            await refresh_table()
-            await refresh_kpi()
+            await apply_local_change(item_id, "cancelled")
         else:
             ui.notify("Ошибка при обновлении", type="negative")
     
@@ -233,11 +396,10 @@ async def wishlist_page():
                 ui.button("Отмена", on_click=dialog.close).props("flat")
                 
                 async def do_delete():
-                    if delete_wishlist_item(item_id, tenant_id):
+                    if await delete_wishlist_item(item_id, tenant_id):
                         ui.notify("Заявка удалена", type="warning")
                         dialog.close()
-                        await refresh_table()
-                        await refresh_kpi()
+                        await apply_local_change(item_id, None)
                     else:
                         ui.notify("Ошибка при удалении", type="negative")
                 
@@ -248,25 +410,58 @@ async def wishlist_page():
     async def go_page(delta: int):
         """Navigate to next/prev page."""
         page_state["current"] = max(0, page_state["current"] + delta)
-        await refresh_table()
+        await refresh_table(count_mode=None)
     
     # KPI Cards row
     kpi_container = None
-
-
+    kpi_stats: dict | None = None
+    kpi_cards = {}  # Built once, then updated in place
+    
+    def render_kpi():
+        """Draw KPI cards from the locally held stats."""
+        if not kpi_container or kpi_stats is None:
+            return
+        values = [
+            ("Ожидают", f"{kpi_stats['pending']}", "hourglass_empty"),
+            ("Заработано", f"{kpi_stats['total_revenue']:,.0f} ₽", "payments"),
+            ("Обработано", f"{kpi_stats['converted']}", "check_circle"),
+            ("Отменено", f"{kpi_stats['cancelled']}", "cancel"),
+        ]
+        if kpi_cards:
+            for title, value, _ in values:
+                kpi_cards[title].set_value(value)
+            return
+        kpi_container.clear()
+        with kpi_container:
+            for title, value, icon in values:
+                kpi_cards[title] = kpi_card(title, value, icon)
+    
+    def shift_kpi(row: dict, status: str | None, amount: float | None):
+        """Move one item between KPI counters (status=None: deleted)."""
+        if kpi_stats is None:
+            return
+        old_status = row.get("status")
+        if old_status in kpi_stats:
+            kpi_stats[old_status] -= 1
+        if old_status == "converted":
+            kpi_stats["total_revenue"] -= float(row.get("amount") or 0)
+        if status in kpi_stats:
+            kpi_stats[status] += 1
+        if status == "converted":
+            kpi_stats["total_revenue"] += float((row.get("amount") if amount is None else amount) or 0)
+        render_kpi()
+    
+    def set_kpi(stats: dict):
+        """Take freshly queried stats as the local KPI state."""
+        nonlocal kpi_stats
+        kpi_stats = stats
+        render_kpi()
     
     async def refresh_kpi():
         """Refresh KPI cards."""
-        nonlocal kpi_container
         if not tenant_id or not kpi_container:
             return
-        stats = get_wishlist_stats(tenant_id)
-        kpi_container.clear()
-        with kpi_container:
-            kpi_card("Ожидают", f"{stats['pending']}", "hourglass_empty")
-            kpi_card("Заработано", f"{stats['total_revenue']:,.0f} ₽", "payments")
-            kpi_card("Обработано", f"{stats['converted']}", "check_circle")
-            kpi_card("Отменено", f"{stats['cancelled']}", "cancel")
+        set_kpi(await get_wishlist_stats(tenant_id))
     
     # Build UI
     with page_layout("Wishlist"):
@@ -291,7 +486,7 @@ async def wishlist_page():
             
             ui.space()
             
-            ui.button(icon="refresh", on_click=refresh_table).props("flat round color=purple").tooltip("Обновить таблицу")
+            ui.button(icon="refresh", on_click=lambda: refresh_table()).props("flat round color=purple").tooltip("Обновить таблицу")
         
         # Stats row
         stats_label = ui.label().classes("text-grey mb-2")
@@ -306,8 +501,15 @@ async def wishlist_page():
             next_btn = ui.button(icon="chevron_right", on_click=lambda: go_page(1)).props("round flat color=grey-7").classes("dark:text-gray-300 hover:bg-gray-200 dark:hover:bg-gray-700")
         
         # Bind status filter
-        status_select.on_value_change(refresh_table)
+        status_select.on_value_change(lambda: refresh_table())
         
-        # Initial load
-        await refresh_kpi()
-        await refresh_table()
+        # Initial load: KPI stats and the first page are queried concurrently
+        if tenant_id:
+            # Rows and KPI counters follow the wishlist change feed (see live.py)
+            live.subscribe_wishlist(tenant_id, on_wishlist_change)
+            await (
+                PageLoader()
+                .add(lambda: load_wishlist_stats(tenant_id), set_kpi, kpi_container, name="wishlist_stats")
+                .add(lambda: fetch_table(strict=True), render_table, table_container, name="wishlist_items")
+                .run()
+            )
@@ -0,0 +1,162 @@
+"""Tests for the wishlist change feed (live.ChangeFeed with LocalChangeSource)."""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add parent dir to path to import live
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# config.Settings requires these; the tests never reach Supabase
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
+os.environ.setdefault("APP_SECRET", "test")
+
+pytest.importorskip("nicegui")
+pytest.importorskip("supabase")
+
+import live  # noqa: E402
+
+TENANT_A = "11111111-1111-1111-1111-111111111111"
+TENANT_B = "22222222-2222-2222-2222-222222222222"
+
+
+@pytest.fixture(autouse=True)
+def plain_background_tasks(monkeypatch):
+    """Run feed tasks on the test loop; NiceGUI's helper needs a running app."""
+    monkeypatch.setattr(
+        live.background_tasks, "create", lambda coroutine, name="": asyncio.ensure_future(coroutine)
+    )
+
+
+async def settle() -> None:
+    """Let scheduled feed tasks and published changes run."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_parse_change_normalizes_payloads():
+    # Realtime v2 callback payload
+    assert live._parse_change(
+        {"data": {"type": "insert", "record": {"id": 1}, "old_record": None}}
+    ) == ("INSERT", {"id": 1}, None)
+    # Flat payload with the older eventType/new/old keys
+    assert live._parse_change(
+        {"eventType": "UPDATE", "new": {"id": 1, "status": "converted"}, "old": {"id": 1}}
+    ) == ("UPDATE", {"id": 1, "status": "converted"}, {"id": 1})
+    # Deletes carry an empty new row
+    assert live._parse_change(
+        {"data": {"type": "DELETE", "record": {}, "old_record": {"id": 1}}}
+    ) == ("DELETE", None, {"id": 1})
+
+
+def test_changes_are_routed_by_tenant():
+    async def scenario():
+        source = live.LocalChangeSource()
+        feed = live.ChangeFeed(source)
+        received = {TENANT_A: [], TENANT_B: []}
+
+        feed.subscribe(TENANT_A, lambda *change: received[TENANT_A].append(change))
+        feed.subscribe(TENANT_B, lambda *change: received[TENANT_B].append(change))
+        await settle()
+
+        new_a = {"id": 1, "tenant_id": TENANT_A, "status": "pending"}
+        old_b = {"id": 2, "tenant_id": TENANT_B, "status": "pending"}
+        new_b = {**old_b, "status": "converted", "amount": 1500}
+        source.publish("insert", new_a)
+        source.publish("update", new_b, old_b)
+        source.publish("delete", None, new_a)
+        await settle()
+
+        assert received[TENANT_A] == [("INSERT", new_a, None), ("DELETE", None, new_a)]
+        assert received[TENANT_B] == [("UPDATE", new_b, old_b)]
+        await feed.stop()
+
+    asyncio.run(scenario())
+
+
+def test_async_callbacks_are_awaited():
+    async def scenario():
+        source = live.LocalChangeSource()
+        feed = live.ChangeFeed(source)
+        received = []
+
+        async def callback(event, new, old):
+            received.append(event)
+
+        feed.subscribe(TENANT_A, callback)
+        await settle()
+        source.publish("INSERT", {"id": 1, "tenant_id": TENANT_A})
+        await settle()
+
+        assert received == ["INSERT"]
+        await feed.stop()
+
+    asyncio.run(scenario())
+
+
+def test_source_stops_after_last_unsubscribe():
+    async def scenario():
+        source = live.LocalChangeSource()
+        feed = live.ChangeFeed(source)
+        received = []
+
+        def callback(*change):
+            received.append(change)
+
+        feed.subscribe(TENANT_A, callback)
+        await settle()
+        feed.unsubscribe(TENANT_A, callback)
+        await settle()
+        source.publish("INSERT", {"id": 1, "tenant_id": TENANT_A})
+        await settle()
+
+        assert received == []
+        assert source._on_change is None
+
+    asyncio.run(scenario())
+
+
+def test_unsubscribe_during_start_leaves_source_stopped():
+    async def scenario():
+        source = live.LocalChangeSource()
+        feed = live.ChangeFeed(source)
+
+        def callback(*change):
+            pass
+
+        # Unsubscribe before the start task had a chance to run
+        feed.subscribe(TENANT_A, callback)
+        feed.unsubscribe(TENANT_A, callback)
+        await settle()
+
+        assert source._on_change is None
+        # A later subscriber starts it again
+        feed.subscribe(TENANT_B, callback)
+        await settle()
+        assert source._on_change is not None
+        await feed.stop()
+
+    asyncio.run(scenario())
+
+
+def test_changes_drop_cached_wishlist_stats():
+    from cache import get_cache
+
+    async def scenario():
+        source = live.LocalChangeSource()
+        feed = live.ChangeFeed(source)
+        key = ("wishlist_stats", TENANT_A, (), ())
+        get_cache().set(key, {"pending": 1}, 30)
+
+        feed.subscribe(TENANT_B, lambda *change: None)
+        await settle()
+        source.publish("INSERT", {"id": 1, "tenant_id": TENANT_A, "status": "pending"})
+        await settle()
+
+        assert get_cache().get(key) == (False, None)
+        await feed.stop()
+
+    asyncio.run(scenario())